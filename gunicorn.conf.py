@@ -0,0 +1,43 @@
+"""
+Gunicorn settings of the production server, tuned by environment variables.
+
+The WSGI workers are processes, each serving GUNICORN_THREADS requests at
+once, so a request waiting on PostgreSQL does not block its whole worker.
+SERVER_INTERFACE=asgi serves the ASGI application with Uvicorn workers.
+"""
+import multiprocessing
+import os
+
+SERVER_INTERFACES = {
+    "wsgi": ("social_media_api.wsgi:application", "gthread"),
+    "asgi": (
+        "social_media_api.asgi:application",
+        "uvicorn.workers.UvicornWorker",
+    ),
+}
+
+# Under ASGI the async views serve many requests at once in every worker
+wsgi_app, default_worker_class = SERVER_INTERFACES[
+    os.environ.get("SERVER_INTERFACE", "wsgi")
+]
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", default_worker_class)
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle the workers now and then to bound any memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+# The heartbeat files are written to memory, not to a possibly slow disk
+worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class SocialMediaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "social_media"
+
+    def ready(self):
+        from django.conf import settings
+        from PIL import Image
+
+        import social_media.signals  # noqa
+
+        # Pillow refuses to decode the images far above the upload limit
+        Image.MAX_IMAGE_PIXELS = settings.IMAGE_UPLOAD_MAX_PIXELS
@@ -0,0 +1,248 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import exception_handler
+
+from social_media.cache import (
+    list_scope,
+    get_response_key,
+    get_cached_data,
+    set_cached_data,
+)
+from social_media.models import Profile, Comment
+from social_media.serializers import (
+    FOLLOWS_PREVIEW_SIZE,
+    LATEST_COMMENTS_SIZE,
+)
+from social_media.timelines import get_merged_author_ids, Timeline
+from social_media.views import ProfileViewSet, PostViewSet
+from social_media_api.db.routers import read_from_primary
+from user.authentication import AsyncJWTAuthentication
+
+ERROR_HEADERS = ("WWW-Authenticate", "Retry-After")
+
+
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    return JsonResponse(
+        data,
+        status=status_code,
+        headers=headers,
+        encoder=JSONEncoder,
+        safe=False,
+    )
+
+
+def _render_exception(request, error):
+    """Answer the errors the way the exception handler of DRF does"""
+    if isinstance(
+        error,
+        (exceptions.NotAuthenticated, exceptions.AuthenticationFailed),
+    ):
+        error.auth_header = AsyncJWTAuthentication().authenticate_header(
+            request
+        )
+
+    response = exception_handler(error, {"request": request})
+    return _render(
+        response.data,
+        response.status_code,
+        headers={
+            name: response[name] for name in ERROR_HEADERS if name in response
+        },
+    )
+
+
+async def _check_throttles(request):
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+
+        if not await sync_to_async(throttle.allow_request)(request, None):
+            raise exceptions.Throttled(throttle.wait())
+
+
+def async_api_view(view):
+    """
+    Serve a read-only async view like the viewsets serve their actions:
+    JWT authentication of the users, the default throttles and the same
+    error responses
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(request, authenticators=())
+
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise exceptions.MethodNotAllowed(request.method)
+
+            result = await AsyncJWTAuthentication().aauthenticate(request)
+
+            if result is None:
+                raise exceptions.NotAuthenticated()
+
+            request.user, request.auth = result
+            await _check_throttles(request)
+            data = await view(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as error:
+            return _render_exception(request, error)
+
+        return _render(data)
+
+    return wrapper
+
+
+def _get_viewset(viewset_class, action, request, **kwargs):
+    """Set up the viewset of the action to reuse its querysets and classes"""
+    return viewset_class(
+        action=action,
+        request=request,
+        args=(),
+        kwargs=kwargs,
+        format_kwarg=None,
+        # The classes overridden by the extra actions
+        **getattr(getattr(viewset_class, action), "kwargs", {}),
+    )
+
+
+async def _aget_object(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+async def _aget_own_profile(request):
+    """Profile of the token claim, loaded only for the older tokens"""
+    try:
+        return await sync_to_async(lambda: request.user.profile)()
+    except ObjectDoesNotExist:
+        raise Http404
+
+
+async def _get_cached_data(request, scopes, get_data):
+    """Async counterpart of CacheResponseMixin sharing its cache scopes"""
+    key = await sync_to_async(get_response_key)(request, *scopes)
+    data = await sync_to_async(get_cached_data)(key)
+
+    if data is None:
+        # Cached for every user, so read like CacheResponseMixin does
+        with read_from_primary():
+            data = await get_data()
+
+        await sync_to_async(set_cached_data)(key, data)
+
+    return data
+
+
+async def _paginate(viewset, queryset):
+    page = await viewset.paginator.apaginate_queryset(
+        queryset,
+        viewset.request,
+        viewset,
+    )
+    serializer = viewset.get_serializer(page, many=True)
+    return viewset.paginator.get_paginated_response(serializer.data).data
+
+
+@async_api_view
+async def list_posts(request):
+    """Async version of the post list"""
+    viewset = _get_viewset(PostViewSet, "list", request)
+
+    async def get_data():
+        # The filters of related objects check them in the database
+        queryset = await sync_to_async(viewset.filter_queryset)(
+            viewset.get_queryset()
+        )
+        return await _paginate(viewset, queryset)
+
+    return await _get_cached_data(
+        request,
+        [list_scope(viewset.cache_scope)],
+        get_data,
+    )
+
+
+@async_api_view
+async def retrieve_post(request, pk):
+    """Async version of the post detail"""
+    viewset = _get_viewset(PostViewSet, "retrieve", request, pk=pk)
+
+    async def get_data():
+        queryset = viewset.get_queryset().prefetch_related(
+            Prefetch(
+                "comments",
+                queryset=(
+                    Comment.objects
+                    .select_related("author")[:LATEST_COMMENTS_SIZE]
+                ),
+                to_attr="latest_comments_list",
+            )
+        )
+        post = await _aget_object(queryset, pk=pk)
+        return viewset.get_serializer(post).data
+
+    return await _get_cached_data(
+        request,
+        await sync_to_async(viewset.get_object_scopes)(pk),
+        get_data,
+    )
+
+
+@async_api_view
+async def list_subscription_posts(request):
+    """Async version of the subscriptions-only feed"""
+    viewset = _get_viewset(
+        PostViewSet,
+        "show_posts_from_subscriptions_only",
+        request,
+    )
+    own_profile = await _aget_own_profile(request)
+    timeline = Timeline(
+        own_profile,
+        [
+            author_id
+            async for author_id in get_merged_author_ids(own_profile)
+        ],
+        viewset.get_queryset(),
+    )
+    return await _paginate(viewset, timeline)
+
+
+def _preview_prefetch(name):
+    return Prefetch(
+        name,
+        queryset=(
+            Profile.objects
+            .order_by("username")
+            .only("id", "username")[:FOLLOWS_PREVIEW_SIZE]
+        ),
+        to_attr=f"{name}_preview_profiles",
+    )
+
+
+@async_api_view
+async def retrieve_profile(request, pk):
+    """Async version of the profile detail"""
+    viewset = _get_viewset(ProfileViewSet, "retrieve", request, pk=pk)
+
+    async def get_data():
+        queryset = viewset.get_queryset().prefetch_related(
+            _preview_prefetch("followings"),
+            _preview_prefetch("followers"),
+        )
+        profile = await _aget_object(queryset, pk=pk)
+        return viewset.get_serializer(profile).data
+
+    return await _get_cached_data(
+        request,
+        await sync_to_async(viewset.get_object_scopes)(pk),
+        get_data,
+    )
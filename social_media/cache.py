@@ -0,0 +1,93 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def object_scope(name, pk):
+    return f"{name}:{pk}"
+
+
+def list_scope(name):
+    return f"{name}:list"
+
+
+def _version_key(scope):
+    return f"version:{scope}"
+
+
+def get_version(scope):
+    """Return the current version of the scope, starting a new one if unset"""
+    return get_versions([scope])[0]
+
+
+def get_versions(scopes):
+    """Return the current versions of the scopes in one cache round trip"""
+    cache = _get_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+
+    if missing:
+        # A time-based start never repeats a version evicted from the cache
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+
+        versions.update(cache.get_many(missing))
+
+    return [versions[key] for key in keys]
+
+
+def invalidate(*scopes):
+    """
+    Bump the versions of the scopes so their cached responses go stale,
+    and again once the current transaction commits: a read between the
+    write and the commit caches the old data under the new version
+    """
+    _bump_versions(scopes)
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def _bump_versions(scopes):
+    cache = _get_cache()
+
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.add(_version_key(scope), time.time_ns(), timeout=None)
+
+
+def invalidate_object(name, pk):
+    invalidate(object_scope(name, pk), list_scope(name))
+
+
+def invalidate_many(name, pks):
+    invalidate(list_scope(name), *[object_scope(name, pk) for pk in pks])
+
+
+def get_response_key(request, *scopes):
+    """Key of the response, stale once any of the scopes is invalidated"""
+    versions = ":".join(
+        f"{scope}:{version}"
+        for scope, version in zip(scopes, get_versions(scopes))
+    )
+    raw_key = f"{versions}:{request.build_absolute_uri()}"
+    digest = hashlib.md5(raw_key.encode(), usedforsecurity=False).hexdigest()
+    return f"response:{digest}"
+
+
+def get_cached_data(key):
+    return _get_cache().get(key)
+
+
+def set_cached_data(key, data):
+    _get_cache().set(key, data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
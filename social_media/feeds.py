@@ -0,0 +1,132 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    Func,
+    OuterRef,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Exp, Ln
+from django.utils import timezone
+
+from social_media.models import Profile, Post
+from social_media.trending import get_trending_hashtags
+
+# Proximity of the candidate sources in the follow graph
+FOLLOWING_PROXIMITY = 1.0
+FOLLOWING_OF_FOLLOWING_PROXIMITY = 0.5
+TRENDING_PROXIMITY = 0.25
+
+
+class Epoch(Func):
+    template = "EXTRACT(EPOCH FROM %(expressions)s)::double precision"
+    output_field = FloatField()
+
+
+def _get_cache_key(profile):
+    return f"feed:{profile.pk}"
+
+
+def get_candidate_posts(profile, now):
+    """
+    Return the recent posts of the followings, of the followings of the
+    followings and with trending hashtags, annotated with their proximity
+    """
+    through = Profile.followings.through
+    following_ids = through.objects.filter(
+        from_profile_id=profile.pk
+    ).values("to_profile_id")
+    second_degree_ids = through.objects.filter(
+        from_profile_id__in=following_ids
+    ).values("to_profile_id")
+    trending_ids = [
+        hashtag["id"]
+        for hashtag in get_trending_hashtags(
+            settings.FEED_TRENDING_WINDOW,
+            settings.TRENDING_TOP_K,
+        )
+    ]
+    has_trending_hashtag = Exists(
+        Post.hashtags.through.objects.filter(
+            post_id=OuterRef("pk"),
+            hashtag_id__in=trending_ids,
+        )
+    )
+
+    return (
+        Post.objects
+        .filter(created_at__gte=now - timedelta(seconds=settings.FEED_MAX_AGE))
+        .exclude(author_id=profile.pk)
+        .filter(
+            Q(author_id__in=following_ids)
+            | Q(author_id__in=second_degree_ids)
+            | Q(has_trending_hashtag)
+        )
+        .annotate(
+            proximity=Case(
+                When(
+                    author_id__in=following_ids,
+                    then=Value(FOLLOWING_PROXIMITY),
+                ),
+                When(
+                    author_id__in=second_degree_ids,
+                    then=Value(FOLLOWING_OF_FOLLOWING_PROXIMITY),
+                ),
+                default=Value(TRENDING_PROXIMITY),
+                output_field=FloatField(),
+            )
+        )
+    )
+
+
+def rank_posts(profile, now=None):
+    """
+    Score every candidate post in a single query and return the ids
+    of the best ones, best first.
+
+    The score adds up the recency, decaying with a half-life, the like and
+    comment velocity, dampened by a logarithm, and the proximity of the
+    author in the follow graph, each with its weight from FEED_WEIGHTS.
+    """
+    now = now or timezone.now()
+    weights = settings.FEED_WEIGHTS
+    age = Value(now.timestamp()) - Epoch("created_at")
+    recency = Exp(-math.log(2) * age / settings.FEED_RECENCY_HALF_LIFE)
+    # Engagement per hour, with a two hour head start for the new posts
+    velocity = (
+        (F("likes_count") + 2 * F("comments_count")) * 3600.0
+        / (age + 2 * 3600.0)
+    )
+
+    return list(
+        get_candidate_posts(profile, now)
+        .annotate(
+            score=(
+                weights["recency"] * recency
+                + weights["engagement"] * Ln(1 + velocity)
+                + weights["proximity"] * F("proximity")
+            )
+        )
+        .order_by("-score", "-id")
+        .values_list("id", flat=True)[:settings.FEED_CANDIDATES_LIMIT]
+    )
+
+
+def get_ranked_post_ids(profile):
+    """Return the ranked feed of the profile, cached for a short while"""
+    key = _get_cache_key(profile)
+    post_ids = cache.get(key)
+
+    if post_ids is None:
+        post_ids = rank_posts(profile)
+        cache.set(key, post_ids, timeout=settings.FEED_CACHE_TIMEOUT)
+
+    return post_ids
@@ -0,0 +1,159 @@
+import io
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from social_media.cache import invalidate_object
+from social_media.models import ImageTask, MediaBlob
+
+FORMAT_EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+}
+
+
+def enqueue_image_processing(instance):
+    """Queue the generation of the variants of the instance's new image"""
+    return ImageTask.objects.create(
+        model_name=instance._meta.model_name,
+        object_id=instance.pk,
+        image=instance.image.name,
+    )
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def _get_save_options(image_format):
+    if image_format == "JPEG":
+        return {"quality": settings.IMAGE_JPEG_QUALITY, "optimize": True}
+
+    if image_format == "WEBP":
+        return {"quality": settings.IMAGE_WEBP_QUALITY, "method": 4}
+
+    return {"optimize": True}
+
+
+def _save(storage, root, image, image_format):
+    buffer = io.BytesIO()
+    # Nothing but the pixels is written, which strips the EXIF data
+    image.save(buffer, image_format, **_get_save_options(image_format))
+    return storage.save(
+        f"{root}.{FORMAT_EXTENSIONS[image_format]}",
+        ContentFile(buffer.getvalue()),
+    )
+
+
+def create_variants(image_file):
+    """
+    Store a copy of the original image stripped of its metadata and its
+    downscaled variants, return the name of the copy and the names
+    of the variants
+    """
+    storage = image_file.storage
+    name = image_file.name
+
+    with storage.open(name) as file:
+        image = Image.open(file)
+        image_format = image.format
+        image.load()
+
+    # The orientation tag is lost with the EXIF data, so apply it first
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+    variant_format = "PNG" if image.mode == "RGBA" else "JPEG"
+
+    if image_format not in FORMAT_EXTENSIONS:
+        image_format = variant_format
+
+    root, _ = os.path.splitext(name)
+    original_name = _save(storage, root, image, image_format)
+    variants = {}
+
+    for size_name, size in settings.IMAGE_VARIANT_SIZES.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        variant_root = f"{root}-{size_name}"
+        variants[size_name] = _save(
+            storage, variant_root, variant, variant_format
+        )
+        variants[f"{size_name}_webp"] = _save(
+            storage, variant_root, variant, "WEBP"
+        )
+
+    return original_name, variants
+
+
+def process_task(task):
+    model = apps.get_model("social_media", task.model_name)
+    instance = (
+        model.objects
+        .filter(pk=task.object_id, image=task.image)
+        .only("id", "image")
+        .first()
+    )
+
+    # The instance is gone or has got a newer image with its own task
+    if instance is None:
+        return
+
+    original_name, variants = create_variants(instance.image)
+    updated = model.objects.filter(pk=instance.pk, image=task.image).update(
+        image=original_name,
+        image_variants=variants,
+        updated_at=timezone.now(),
+    )
+
+    # The file with the metadata is purged with the other orphaned media
+    if updated:
+        MediaBlob.acquire({original_name, *variants.values()})
+        MediaBlob.release({task.image})
+        invalidate_object(task.model_name, instance.pk)
+
+
+def process_next_task():
+    """
+    Process the oldest pending task that no other worker has locked,
+    return it or None if the queue is empty
+    """
+    with transaction.atomic():
+        task = (
+            ImageTask.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ImageTask.Status.PENDING)
+            .order_by("created_at")
+            .first()
+        )
+
+        if task is None:
+            return None
+
+        task.attempts += 1
+
+        # The decoders raise about anything on a malformed upload, which
+        # would otherwise roll the attempt back and fail at every poll
+        try:
+            with transaction.atomic():
+                process_task(task)
+        except Exception as error:
+            task.error = f"{error.__class__.__name__}: {error}"
+
+            if task.attempts >= settings.IMAGE_TASK_MAX_ATTEMPTS:
+                task.status = ImageTask.Status.FAILED
+        else:
+            task.status = ImageTask.Status.DONE
+            task.error = ""
+            task.processed_at = timezone.now()
+
+        task.save()
+
+    return task
@@ -0,0 +1,101 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from social_media_api.db.pooled.base import close_pools
+
+POOLED_ENGINE = "social_media_api.db.pooled"
+
+
+class Command(BaseCommand):
+    """
+    Run many short "requests" from concurrent threads, each one query
+    followed by the end-of-request handling of its connection, without
+    persistent connections, with them, and with the pool; report the
+    throughput and the number of physical connections opened
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        settings_dict = connections[options["database"]].settings_dict
+        options_without_pool = {
+            key: value
+            for key, value in settings_dict["OPTIONS"].items()
+            if key != "pool"
+        }
+        modes = {
+            "no persistent connections": {
+                "ENGINE": "django.db.backends.postgresql",
+                "OPTIONS": options_without_pool,
+                "CONN_MAX_AGE": 0,
+            },
+            "persistent connections": {
+                "ENGINE": "django.db.backends.postgresql",
+                "OPTIONS": options_without_pool,
+                "CONN_MAX_AGE": 60,
+            },
+            "connection pool": {
+                "ENGINE": POOLED_ENGINE,
+                "OPTIONS": {
+                    **options_without_pool,
+                    "pool": {"max_size": options["threads"]},
+                },
+                "CONN_MAX_AGE": 0,
+            },
+        }
+
+        for name, overrides in modes.items():
+            self.stdout.write(f"{name}...")
+            requests_per_second, connections_count = self.measure(
+                options["database"],
+                {**copy.deepcopy(settings_dict), **overrides},
+                options["threads"],
+                options["requests"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{requests_per_second:.0f} req/s, "
+                    f"{connections_count} connection(s) opened"
+                )
+            )
+
+        close_pools()
+
+    @staticmethod
+    def measure(alias, settings_dict, threads, requests):
+        backend = load_backend(settings_dict["ENGINE"])
+
+        def run(_):
+            # Every thread has its own connection, as in a threaded server
+            wrapper = backend.DatabaseWrapper(
+                copy.deepcopy(settings_dict),
+                alias=alias,
+            )
+            backend_pids = set()
+
+            for _ in range(requests):
+                with wrapper.cursor() as cursor:
+                    cursor.execute("SELECT pg_backend_pid()")
+                    backend_pids.add(cursor.fetchone()[0])
+
+                # What Django does when a request finishes
+                wrapper.close_if_unusable_or_obsolete()
+
+            wrapper.close()
+            return backend_pids
+
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(threads) as executor:
+            backend_pids = set().union(*executor.map(run, range(threads)))
+
+        elapsed = time.perf_counter() - start
+        return threads * requests / elapsed, len(backend_pids)
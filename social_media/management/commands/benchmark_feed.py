@@ -0,0 +1,143 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from social_media.feeds import rank_posts
+from social_media.models import Profile, Hashtag, Post
+from social_media.trending import (
+    clear_trending_cache,
+    recompute_trending_hashtags,
+)
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", type=int, default=2000)
+        parser.add_argument("--followings", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=5)
+        parser.add_argument("--hashtags", type=int, default=200)
+        parser.add_argument("--samples", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+
+        # The synthetic graph lives in a transaction that is rolled back
+        with transaction.atomic():
+            self.stdout.write("Building the synthetic graph...")
+            profiles = self.create_graph(options)
+            recompute_trending_hashtags(settings.FEED_TRENDING_WINDOW)
+            clear_trending_cache()
+            self.stdout.write(
+                f"Scoring the feeds of {options['samples']} profiles..."
+            )
+            timings = self.measure(profiles, options["samples"])
+            transaction.set_rollback(True)
+
+        clear_trending_cache()
+
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"p50: {quantiles[49]:.1f} ms, p99: {quantiles[98]:.1f} ms"
+            )
+        )
+
+    def create_graph(self, options):
+        prefix = f"benchmark-{time.time_ns()}"
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(email=f"{prefix}-{i}@example.com")
+                for i in range(options["profiles"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        profiles = Profile.objects.bulk_create(
+            [
+                Profile(user=user, username=user.email)
+                for user in users
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        hashtags = Hashtag.objects.bulk_create(
+            [
+                Hashtag(name=f"{prefix}-{i}")
+                for i in range(options["hashtags"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        follows = Profile.followings.through
+        follows.objects.bulk_create(
+            [
+                follows(from_profile_id=profile.id, to_profile_id=author.id)
+                for profile in profiles
+                for author in self.random.sample(
+                    profiles,
+                    min(options["followings"], len(profiles)),
+                )
+                if author.id != profile.id
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+        now = timezone.now()
+        posts = Post.objects.bulk_create(
+            [
+                Post(
+                    author=profile,
+                    title="Benchmark",
+                    content="Benchmark",
+                    likes_count=self.random.randint(0, 100),
+                    comments_count=self.random.randint(0, 20),
+                )
+                for profile in profiles
+                for _ in range(options["posts"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        for post in posts:
+            post.created_at = now - timedelta(
+                seconds=self.random.randint(0, 7 * 24 * 60 * 60)
+            )
+
+        Post.objects.bulk_update(posts, ["created_at"], batch_size=BATCH_SIZE)
+
+        tags = Post.hashtags.through
+        tags.objects.bulk_create(
+            [
+                tags(post_id=post.id, hashtag_id=hashtag.id)
+                for post in posts
+                for hashtag in self.random.sample(
+                    hashtags,
+                    min(2, len(hashtags)),
+                )
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        return profiles
+
+    def measure(self, profiles, samples):
+        timings = []
+
+        for profile in self.random.sample(
+            profiles,
+            min(samples, len(profiles)),
+        ):
+            start = time.perf_counter()
+            rank_posts(profile)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return timings
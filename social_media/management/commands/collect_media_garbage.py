@@ -0,0 +1,129 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from social_media.models import Profile, Post, MediaBlob
+
+BATCH_SIZE = 1000
+
+
+def count_references():
+    """Count the instances referring to every stored media file"""
+    references = Counter()
+
+    for model in (Profile, Post):
+        rows = model.objects.values_list("image", "image_variants")
+
+        for image, variants in rows.iterator(chunk_size=BATCH_SIZE):
+            references.update({image, *variants.values()} - {"", None})
+
+    return references
+
+
+def walk_storage(storage, directory=""):
+    directories, files = storage.listdir(directory)
+
+    for name in files:
+        yield f"{directory}/{name}" if directory else name
+
+    for name in directories:
+        yield from walk_storage(
+            storage,
+            f"{directory}/{name}" if directory else name,
+        )
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=settings.MEDIA_GC_GRACE_PERIOD,
+            help="Seconds an orphaned file is kept for, in case it is reused",
+        )
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help=(
+                "Recount the references from the models and purge the stored "
+                "files unknown to them too"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options["grace_period"])
+
+        if options["reconcile"]:
+            self.reconcile(cutoff)
+
+        self.stdout.write("Purging the orphaned media files...")
+        purged = 0
+
+        while True:
+            with transaction.atomic():
+                blobs = list(
+                    MediaBlob.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(refcount=0, updated_at__lt=cutoff)
+                    .order_by("updated_at")[:BATCH_SIZE]
+                )
+
+                if not blobs:
+                    break
+
+                for blob in blobs:
+                    default_storage.delete(blob.name)
+
+                MediaBlob.objects.filter(
+                    pk__in=[blob.pk for blob in blobs]
+                ).delete()
+                purged += len(blobs)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{purged} orphaned media file(s) purged!")
+        )
+
+    def reconcile(self, cutoff):
+        self.stdout.write("Recounting the media references...")
+        references = count_references()
+        MediaBlob.objects.bulk_create(
+            [MediaBlob(name=name) for name in references],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+        now = timezone.now()
+        changed = []
+
+        for blob in MediaBlob.objects.iterator(chunk_size=BATCH_SIZE):
+            refcount = references.get(blob.name, 0)
+
+            if blob.refcount != refcount:
+                blob.refcount = refcount
+                blob.updated_at = now
+                changed.append(blob)
+
+        MediaBlob.objects.bulk_update(
+            changed,
+            ["refcount", "updated_at"],
+            batch_size=BATCH_SIZE,
+        )
+        self.stdout.write(f"{len(changed)} reference count(s) fixed.")
+
+        known_names = set(MediaBlob.objects.values_list("name", flat=True))
+        unknown = 0
+
+        for name in walk_storage(default_storage):
+            if (
+                name not in known_names
+                and default_storage.get_modified_time(name) < cutoff
+            ):
+                default_storage.delete(name)
+                unknown += 1
+
+        self.stdout.write(f"{unknown} unknown media file(s) purged.")
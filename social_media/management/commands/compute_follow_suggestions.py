@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from social_media.suggestions import compute_follow_suggestions
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        self.stdout.write("Computing the follow suggestions...")
+        stored = compute_follow_suggestions()
+        self.stdout.write(
+            self.style.SUCCESS(f"{stored} follow suggestion(s) are stored!")
+        )
@@ -0,0 +1,72 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Send concurrent GET requests to the paths of a running server and
+    report the throughput and the latencies of every path
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url")
+        parser.add_argument("paths", nargs="+")
+        parser.add_argument("--token", help="Access token of a user")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        headers = {}
+
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        for path in options["paths"]:
+            url = options["base_url"].rstrip("/") + path
+            self.stdout.write(
+                f"{url}: {options['requests']} requests, "
+                f"{options['concurrency']} at once..."
+            )
+            self.run(Request(url, headers=headers), options)
+
+    def run(self, request, options):
+        def send(_):
+            start = time.perf_counter()
+
+            try:
+                with urlopen(request, timeout=options["timeout"]) as response:
+                    response.read()
+                    succeeded = response.status == 200
+            except (HTTPError, OSError):
+                succeeded = False
+
+            return succeeded, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(send, range(options["requests"])))
+
+        elapsed = time.perf_counter() - start
+        timings = [timing for succeeded, timing in results if succeeded]
+        failures = len(results) - len(timings)
+
+        if len(timings) < 2:
+            self.stdout.write(self.style.ERROR(f"{failures} failed requests"))
+            return
+
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(timings) / elapsed:.0f} req/s, "
+                f"p50: {quantiles[49]:.1f} ms, "
+                f"p99: {quantiles[98]:.1f} ms, "
+                f"{failures} failed"
+            )
+        )
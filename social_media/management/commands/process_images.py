@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from social_media.images import process_next_task
+from social_media.models import ImageTask
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling it",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Processing the uploaded images...")
+
+        while True:
+            task = process_next_task()
+
+            if task is None:
+                if options["once"]:
+                    break
+
+                time.sleep(settings.IMAGE_WORKER_POLL_INTERVAL)
+                continue
+
+            if task.status == ImageTask.Status.DONE:
+                self.stdout.write(f"Processed {task.image}")
+            else:
+                self.stderr.write(
+                    f"Failed to process {task.image}: {task.error}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("The image queue is empty!"))
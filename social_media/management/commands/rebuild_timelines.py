@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from social_media.models import Profile, TimelineEntry
+from social_media.timelines import add_authors_to_timeline
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding the timelines...")
+        TimelineEntry.objects.all().delete()
+
+        for profile in Profile.objects.only("id").iterator(chunk_size=500):
+            add_authors_to_timeline(profile, profile.followings.values("id"))
+
+        self.stdout.write(self.style.SUCCESS("The timelines are rebuilt!"))
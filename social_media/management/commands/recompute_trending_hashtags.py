@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from social_media.trending import (
+    clear_trending_cache,
+    recompute_trending_hashtags,
+)
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            action="append",
+            dest="windows",
+            help="Recompute only this window, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        windows = options["windows"] or list(settings.TRENDING_WINDOWS)
+        unknown = set(windows) - set(settings.TRENDING_WINDOWS)
+
+        if unknown:
+            raise CommandError(
+                f"Unknown windows: {', '.join(sorted(unknown))}"
+            )
+
+        for window in windows:
+            self.stdout.write(f"Recomputing the {window} trending scores...")
+            count = recompute_trending_hashtags(window)
+            self.stdout.write(f"{count} hashtags are scored.")
+
+        clear_trending_cache()
+        self.stdout.write(
+            self.style.SUCCESS("The trending hashtags are recomputed!")
+        )
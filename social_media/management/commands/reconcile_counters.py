@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from social_media.models import Profile, Hashtag, Post, Comment
+
+BATCH_SIZE = 10000
+
+COUNTERS = (
+    (Hashtag, "posts_count", Post.hashtags.through, "hashtag_id"),
+    (Post, "likes_count", Post.likes.through, "post_id"),
+    (Post, "comments_count", Comment, "post_id"),
+    (Profile, "followers_count", Profile.followings.through, "to_profile_id"),
+    (
+        Profile,
+        "followings_count",
+        Profile.followings.through,
+        "from_profile_id",
+    ),
+)
+
+
+def count_subquery(related_model, related_field):
+    return Coalesce(
+        Subquery(
+            related_model.objects
+            .filter(**{related_field: OuterRef("pk")})
+            .order_by()
+            .values(related_field)
+            .annotate(total=Count("*"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        self.stdout.write("Reconciling the counters...")
+
+        for model, counter, related_model, related_field in COUNTERS:
+            actual_count = count_subquery(related_model, related_field)
+            fields = {counter: actual_count}
+
+            if hasattr(model, "updated_at"):
+                fields["updated_at"] = Now()
+
+            last_id = model.objects.order_by("-id").values_list(
+                "id", flat=True
+            ).first() or 0
+            fixed = 0
+
+            for start in range(0, last_id + 1, BATCH_SIZE):
+                fixed += (
+                    model.objects
+                    .filter(id__gte=start, id__lt=start + BATCH_SIZE)
+                    .exclude(**{counter: actual_count})
+                    .update(**fields)
+                )
+
+            self.stdout.write(
+                f"{model.__name__}.{counter}: {fixed} row(s) fixed."
+            )
+
+        self.stdout.write(self.style.SUCCESS("The counters are reconciled!"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from social_media.timelines import trim_timelines
+
+
+class Command(BaseCommand):
+    """
+    Trim the timelines grown over TIMELINE_MAX_LENGTH by the fan-out of
+    the new posts; meant to run periodically
+    """
+
+    def handle(self, *args, **options):
+        self.stdout.write("Trimming the timelines...")
+        count = trim_timelines()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} timeline(s) trimmed!")
+        )
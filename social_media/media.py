@@ -0,0 +1,139 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) bytes of a single range, None to send the
+    whole file, or raise ValueError if the range cannot be satisfied
+    """
+    match = RANGE_PATTERN.match(header.strip())
+
+    # Invalid and multiple ranges are ignored, which the RFC allows
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        raise ValueError
+
+    return start, end
+
+
+def read_range(media_file, start, end):
+    media_file.seek(start)
+    remaining = end - start + 1
+
+    try:
+        while remaining > 0:
+            chunk = media_file.read(min(CHUNK_SIZE, remaining))
+
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        media_file.close()
+
+
+def set_cache_headers(response, name, stat):
+    content_type, encoding = mimetypes.guess_type(name)
+    response["Content-Type"] = content_type or "application/octet-stream"
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+
+    # Media files are named after their content, so they never change
+    response["Cache-Control"] = (
+        f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"
+    )
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a media file, through the front web server when it handles
+    MEDIA_SENDFILE_HEADER, or streamed by a sendfile-capable response
+    honouring single byte ranges otherwise
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("The media file does not exist.")
+
+    if not os.path.isfile(full_path):
+        raise Http404("The media file does not exist.")
+
+    if not was_modified_since(
+        request.headers.get("If-Modified-Since"),
+        stat.st_mtime,
+    ):
+        return set_cache_headers(HttpResponseNotModified(), path, stat)
+
+    header = settings.MEDIA_SENDFILE_HEADER
+
+    if header:
+        response = HttpResponse()
+
+        # nginx maps an internal URI, the other servers take the file path
+        if header.lower() == "x-accel-redirect":
+            response[header] = settings.MEDIA_SENDFILE_ROOT + path
+        else:
+            response[header] = full_path
+
+        return set_cache_headers(response, path, stat)
+
+    try:
+        byte_range = parse_range(
+            request.headers.get("Range", ""),
+            stat.st_size,
+        )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if byte_range is None:
+        # A whole file goes through wsgi.file_wrapper, so the sendfile()
+        # of the WSGI server when it has one
+        response = FileResponse(open(full_path, "rb"))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(open(full_path, "rb"), start, end),
+            status=206,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = end - start + 1
+
+    return set_cache_headers(response, path, stat)
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0004_denormalized_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "-created_at", "-id"],
+                name="comment_post_created_at_idx",
+            ),
+        ),
+    ]
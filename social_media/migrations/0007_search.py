@@ -0,0 +1,74 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+POST_SEARCH_VECTOR_SQL = """
+CREATE FUNCTION social_media_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER social_media_post_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, content, search_vector
+ON social_media_post
+FOR EACH ROW EXECUTE FUNCTION social_media_post_search_vector_update();
+
+UPDATE social_media_post SET search_vector = NULL;
+"""
+
+POST_SEARCH_VECTOR_REVERSE_SQL = """
+DROP TRIGGER social_media_post_search_vector_trigger ON social_media_post;
+DROP FUNCTION social_media_post_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0006_updated_at"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "content", config="english"
+                ),
+                name="comment_content_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="post_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["username", "first_name", "last_name"],
+                name="profile_names_trgm_idx",
+                opclasses=["gin_trgm_ops", "gin_trgm_ops", "gin_trgm_ops"],
+            ),
+        ),
+        migrations.RunSQL(
+            POST_SEARCH_VECTOR_SQL,
+            POST_SEARCH_VECTOR_REVERSE_SQL,
+        ),
+    ]
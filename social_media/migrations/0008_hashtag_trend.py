@@ -0,0 +1,51 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0007_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HashtagTrend",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("window", models.CharField(max_length=16)),
+                ("log_score", models.FloatField()),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trends",
+                        to="social_media.hashtag",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["window", "-log_score"], name="hashtag_trend_score_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagtrend",
+            constraint=models.UniqueConstraint(
+                fields=("hashtag", "window"), name="unique_hashtag_trend"
+            ),
+        ),
+    ]
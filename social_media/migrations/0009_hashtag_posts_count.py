@@ -0,0 +1,51 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:46
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.functions.text
+
+
+def populate_posts_count(apps, schema_editor):
+    Hashtag = apps.get_model("social_media", "Hashtag")
+    Post = apps.get_model("social_media", "Post")
+
+    Hashtag.objects.update(
+        posts_count=Coalesce(
+            Subquery(
+                Post.hashtags.through.objects.filter(hashtag_id=OuterRef("pk"))
+                .order_by()
+                .values("hashtag_id")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0008_hashtag_trend"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hashtag",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_posts_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="hashtag",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="hashtag_name_prefix_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+def enqueue_existing_images(apps, schema_editor):
+    ImageTask = apps.get_model("social_media", "ImageTask")
+
+    for model_name in ("profile", "post"):
+        model = apps.get_model("social_media", model_name)
+        ImageTask.objects.bulk_create(
+            [
+                ImageTask(model_name=model_name, object_id=pk, image=image)
+                for pk, image in model.objects.exclude(image__isnull=True)
+                .exclude(image="")
+                .values_list("id", "image")
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0010_follow_suggestion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.CreateModel(
+            name="ImageTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=32)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("image", models.CharField(max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["created_at"],
+                        name="image_task_pending_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(enqueue_existing_images, migrations.RunPython.noop),
+    ]
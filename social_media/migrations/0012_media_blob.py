@@ -0,0 +1,61 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:59
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_existing_references(apps, schema_editor):
+    MediaBlob = apps.get_model("social_media", "MediaBlob")
+    references = Counter()
+
+    for model_name in ("profile", "post"):
+        model = apps.get_model("social_media", model_name)
+
+        for image, variants in model.objects.values_list("image", "image_variants"):
+            references.update({image, *variants.values()} - {"", None})
+
+    MediaBlob.objects.bulk_create(
+        [
+            MediaBlob(name=name, refcount=refcount)
+            for name, refcount in references.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0011_image_processing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("refcount", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("refcount", 0)),
+                        fields=["updated_at"],
+                        name="media_blob_orphan_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_existing_references, migrations.RunPython.noop),
+    ]
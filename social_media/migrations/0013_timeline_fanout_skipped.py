@@ -0,0 +1,47 @@
+# Generated by Django 4.2.6 on 2026-10-18 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_skipped_posts(apps, schema_editor):
+    # The posts of the high-follower authors were not fanned out so far
+    Post = apps.get_model("social_media", "Post")
+    Post.objects.filter(
+        author__followers_count__gte=settings.TIMELINE_FANOUT_FOLLOWERS_LIMIT
+    ).update(fanout_skipped=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social_media", "0012_media_blob"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="timelineentry",
+            name="timeline_profile_created_idx",
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="fanout_skipped",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_skipped_posts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("fanout_skipped", True)),
+                fields=["author", "-created_at", "-id"],
+                name="post_fanout_skipped_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["profile", "-created_at", "-post"],
+                name="timeline_profile_created_idx",
+            ),
+        ),
+    ]
@@ -1,10 +1,48 @@
 import os
+import re
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Now, Upper
+from django.utils import timezone
 from django.utils.text import slugify
 
+from social_media.cache import (
+    list_scope,
+    invalidate,
+    invalidate_object,
+    invalidate_many,
+)
+
+SEARCH_CONFIG = "english"
+
+# A "#" not glued to a word or an entity, followed by a word with a letter
+HASHTAG_PATTERN = re.compile(r"(?<![\w#&])#(\w*[^\W\d_]\w*)")
+
+
+def insert_new_rows(model, columns, rows, returning):
+    """
+    Insert the rows into the table of the model in one statement, skipping
+    the ones conflicting with existing rows, return the set of the values
+    of the returning column of the rows actually inserted
+    """
+    quote_name = connection.ops.quote_name
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote_name(model._meta.db_table)} "
+            f"({', '.join(map(quote_name, columns))}) "
+            f"VALUES {', '.join([placeholders] * len(rows))} "
+            f"ON CONFLICT DO NOTHING RETURNING {quote_name(returning)}",
+            [value for row in rows for value in row],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
 
 def create_custom_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -21,6 +59,30 @@ def create_custom_image_file_path(instance, filename):
     )
 
 
+def get_media_names(instance):
+    """Return the names of the stored files the image fields refer to"""
+    names = set(instance.image_variants.values())
+
+    if instance.image:
+        names.add(instance.image.name)
+
+    return names
+
+
+def extract_hashtag_names(*texts, limit=None):
+    """Return the lowercased names of the #tags in the texts in order"""
+    names = {}
+
+    for text in texts:
+        for match in HASHTAG_PATTERN.finditer(text):
+            names.setdefault(match.group(1).lower()[:255], None)
+
+            if limit is not None and len(names) == limit:
+                return list(names)
+
+    return list(names)
+
+
 class Profile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -37,25 +99,195 @@ class Profile(models.Model):
         symmetrical=False,
         blank=True,
     )
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    followings_count = models.PositiveIntegerField(default=0, editable=False)
     image = models.ImageField(
         upload_to=create_custom_image_file_path,
         null=True,
         blank=True,
     )
+    # Names of the processed variants of the image by size and format
+    image_variants = models.JSONField(default=dict, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=["username", "first_name", "last_name"],
+                opclasses=["gin_trgm_ops"] * 3,
+                name="profile_names_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.username
 
+    def follow(self, profile):
+        """Follow the profile, return False if it is already followed"""
+        following = Profile.followings.through.objects.filter(
+            from_profile_id=self.pk,
+            to_profile_id=profile.pk,
+        )
+
+        if following.exists():
+            return False
+
+        try:
+            with transaction.atomic():
+                Profile.followings.through.objects.create(
+                    from_profile_id=self.pk,
+                    to_profile_id=profile.pk,
+                )
+                Profile.objects.filter(pk=profile.pk).update(
+                    followers_count=F("followers_count") + 1,
+                    updated_at=timezone.now(),
+                )
+                Profile.objects.filter(pk=self.pk).update(
+                    followings_count=F("followings_count") + 1,
+                    updated_at=timezone.now(),
+                )
+        except IntegrityError:
+            return False
+
+        invalidate_object("profile", profile.pk)
+        invalidate_object("profile", self.pk)
+        return True
+
+    def unfollow(self, profile):
+        """Unfollow the profile, return False if it is not followed"""
+        with transaction.atomic():
+            deleted, _ = Profile.followings.through.objects.filter(
+                from_profile_id=self.pk,
+                to_profile_id=profile.pk,
+            ).delete()
+
+            if deleted:
+                Profile.objects.filter(pk=profile.pk).update(
+                    followers_count=F("followers_count") - 1,
+                    updated_at=timezone.now(),
+                )
+                Profile.objects.filter(pk=self.pk).update(
+                    followings_count=F("followings_count") - 1,
+                    updated_at=timezone.now(),
+                )
+
+        if deleted:
+            invalidate_object("profile", profile.pk)
+            invalidate_object("profile", self.pk)
+
+        return bool(deleted)
+
+    def follow_many(self, profile_ids):
+        """Follow the profiles in bulk, return the ids of the new followings"""
+        profile_ids = set(profile_ids) - {self.pk}
+
+        if not profile_ids:
+            return profile_ids
+
+        with transaction.atomic():
+            # Only the rows inserted count, a concurrent replay inserts none
+            new_ids = insert_new_rows(
+                Profile.followings.through,
+                ["from_profile_id", "to_profile_id"],
+                [(self.pk, profile_id) for profile_id in profile_ids],
+                "to_profile_id",
+            )
+
+            if not new_ids:
+                return new_ids
+
+            self._update_follow_counters(new_ids, 1)
+
+        invalidate_many("profile", [self.pk, *new_ids])
+        return new_ids
+
+    def unfollow_many(self, profile_ids):
+        """Unfollow the profiles in bulk, return the ids of the unfollowed"""
+        followings = Profile.followings.through.objects.filter(
+            from_profile_id=self.pk,
+            to_profile_id__in=profile_ids,
+        )
+
+        with transaction.atomic():
+            unfollowed_ids = set(
+                followings
+                .select_for_update()
+                .values_list("to_profile_id", flat=True)
+            )
+
+            if unfollowed_ids:
+                followings.delete()
+                self._update_follow_counters(unfollowed_ids, -1)
+
+        if unfollowed_ids:
+            invalidate_many("profile", [self.pk, *unfollowed_ids])
+
+        return unfollowed_ids
+
+    def _update_follow_counters(self, profile_ids, delta):
+        Profile.objects.filter(pk__in=profile_ids).update(
+            followers_count=F("followers_count") + delta,
+            updated_at=timezone.now(),
+        )
+        Profile.objects.filter(pk=self.pk).update(
+            followings_count=F("followings_count") + delta * len(profile_ids),
+            updated_at=timezone.now(),
+        )
+
 
 class Hashtag(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Serves the case-insensitive prefix lookups of the autocomplete
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="hashtag_name_prefix_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def get_or_create_many(cls, names):
+        """
+        Get or create the hashtags of the lowercased names with one lookup
+        and one bulk insert, return them by name together with the set of
+        the created names
+        """
+        # Case-insensitive, like the autocomplete, for the names stored
+        # before they were all lowercased
+        hashtags = {
+            hashtag.name.lower(): hashtag
+            for hashtag in cls.objects.annotate(
+                upper_name=Upper("name")
+            ).filter(upper_name__in=[name.upper() for name in names])
+        }
+        created_names = set(names) - set(hashtags)
+
+        if created_names:
+            cls.objects.bulk_create(
+                [cls(name=name) for name in created_names],
+                ignore_conflicts=True,
+            )
+            hashtags.update(
+                (hashtag.name, hashtag)
+                for hashtag in cls.objects.filter(name__in=created_names)
+            )
+            invalidate(list_scope("hashtag"))
+
+        return hashtags, created_names
+
+    @classmethod
+    def update_posts_counts(cls, hashtag_ids, delta):
+        cls.objects.filter(pk__in=hashtag_ids).update(
+            posts_count=F("posts_count") + delta
+        )
+
 
 class Post(models.Model):
     title = models.CharField(max_length=255)
@@ -76,15 +308,140 @@ class Post(models.Model):
         related_name="posts_likes",
         blank=True,
     )
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
     image = models.ImageField(
         upload_to=create_custom_image_file_path,
         null=True,
         blank=True,
     )
+    # Names of the processed variants of the image by size and format
+    image_variants = models.JSONField(default=dict, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger from the title and the content
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Posts of the high-follower authors are not fanned out to the
+    # timelines but merged into them on read
+    fanout_skipped = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="post_created_at_id_idx",
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                condition=Q(fanout_skipped=True),
+                name="post_fanout_skipped_idx",
+            ),
+            GinIndex(
+                fields=["search_vector"],
+                name="post_search_vector_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Post '{self.title}' by {self.author}"
 
+    def like(self, profile):
+        """Like the post, return False if it is already liked"""
+        like = Post.likes.through.objects.filter(
+            post_id=self.pk,
+            profile_id=profile.pk,
+        )
+
+        if like.exists():
+            return False
+
+        try:
+            with transaction.atomic():
+                Post.likes.through.objects.create(
+                    post_id=self.pk,
+                    profile_id=profile.pk,
+                )
+                Post.objects.filter(pk=self.pk).update(
+                    likes_count=F("likes_count") + 1,
+                    updated_at=timezone.now(),
+                )
+        except IntegrityError:
+            return False
+
+        invalidate_object("post", self.pk)
+        return True
+
+    def unlike(self, profile):
+        """Remove the like from the post, return False if there is none"""
+        with transaction.atomic():
+            deleted, _ = Post.likes.through.objects.filter(
+                post_id=self.pk,
+                profile_id=profile.pk,
+            ).delete()
+
+            if deleted:
+                Post.objects.filter(pk=self.pk).update(
+                    likes_count=F("likes_count") - 1,
+                    updated_at=timezone.now(),
+                )
+
+        if deleted:
+            invalidate_object("post", self.pk)
+
+        return bool(deleted)
+
+    @classmethod
+    def like_many(cls, profile, post_ids):
+        """Like the posts in bulk, return the ids of the newly liked ones"""
+        post_ids = set(post_ids)
+
+        if not post_ids:
+            return post_ids
+
+        with transaction.atomic():
+            # Only the rows inserted count, a concurrent replay inserts none
+            new_ids = insert_new_rows(
+                cls.likes.through,
+                ["post_id", "profile_id"],
+                [(post_id, profile.pk) for post_id in post_ids],
+                "post_id",
+            )
+
+            if not new_ids:
+                return new_ids
+
+            cls.objects.filter(pk__in=new_ids).update(
+                likes_count=F("likes_count") + 1,
+                updated_at=timezone.now(),
+            )
+
+        invalidate_many("post", new_ids)
+        return new_ids
+
+    @classmethod
+    def unlike_many(cls, profile, post_ids):
+        """Remove the likes from the posts in bulk, return the unliked ids"""
+        likes = cls.likes.through.objects.filter(
+            profile_id=profile.pk,
+            post_id__in=post_ids,
+        )
+
+        with transaction.atomic():
+            unliked_ids = set(
+                likes.select_for_update().values_list("post_id", flat=True)
+            )
+
+            if unliked_ids:
+                likes.delete()
+                cls.objects.filter(pk__in=unliked_ids).update(
+                    likes_count=F("likes_count") - 1,
+                    updated_at=timezone.now(),
+                )
+
+        if unliked_ids:
+            invalidate_many("post", unliked_ids)
+
+        return unliked_ids
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -99,9 +456,196 @@ class Comment(models.Model):
     )
     content = models.TextField(max_length=2000)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["post", "-created_at", "-id"],
+                name="comment_post_created_at_idx",
+            ),
+            GinIndex(
+                SearchVector("content", config=SEARCH_CONFIG),
+                name="comment_content_search_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} created at {str(self.created_at)}"
+
+
+class TimelineEntry(models.Model):
+    profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "post"],
+                name="unique_timeline_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["profile", "-created_at", "-post"],
+                name="timeline_profile_created_idx",
+            ),
+        ]
+        verbose_name_plural = "timeline entries"
+
+    def __str__(self):
+        return f"{self.post} in the timeline of {self.profile}"
+
+
+class HashtagTrend(models.Model):
+    """
+    Exponentially decayed usage of a hashtag over one trending window,
+    stored as a log-score relative to a fixed epoch, so the ranking of
+    the scores does not change as they decay
+    """
+    hashtag = models.ForeignKey(
+        Hashtag,
+        on_delete=models.CASCADE,
+        related_name="trends",
+    )
+    window = models.CharField(max_length=16)
+    log_score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hashtag", "window"],
+                name="unique_hashtag_trend",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["window", "-log_score"],
+                name="hashtag_trend_score_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Trend of {self.hashtag} over {self.window}"
+
+
+class FollowSuggestion(models.Model):
+    """Profile precomputed as worth following by another one"""
+    profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name="follow_suggestions",
+    )
+    suggested = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    score = models.FloatField()
+    mutual_followings_count = models.PositiveIntegerField()
+    shared_hashtags_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "suggested"],
+                name="unique_follow_suggestion",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["profile", "-score"],
+                name="follow_suggestion_score_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.suggested} suggested to {self.profile}"
+
+
+class ImageTask(models.Model):
+    """Uploaded image waiting for its variants to be generated"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        DONE = "done"
+        FAILED = "failed"
+
+    model_name = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    image = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="image_task_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Processing of {self.image} ({self.status})"
+
+
+class MediaBlob(models.Model):
+    """Stored media file with the number of the instances referring to it"""
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(refcount=0),
+                name="media_blob_orphan_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+    @classmethod
+    def acquire(cls, names):
+        if not names:
+            return
+
+        cls.objects.bulk_create(
+            [cls(name=name) for name in names],
+            ignore_conflicts=True,
+        )
+        cls.objects.filter(name__in=names).update(
+            refcount=F("refcount") + 1,
+            updated_at=Now(),
+        )
+
+    @classmethod
+    def release(cls, names):
+        if not names:
+            return
+
+        cls.objects.filter(name__in=names, refcount__gt=0).update(
+            refcount=F("refcount") - 1,
+            updated_at=Now(),
+        )
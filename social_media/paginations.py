@@ -1,11 +1,210 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from datetime import datetime
 
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
 
-class ProfilePagination(PageNumberPagination):
-    page_size = 10
+
+def get_keyset_filter(ordering, position):
+    """Build the lexicographic "comes after the position" condition"""
+    keyset_filter = Q()
+
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": position[index]})
+
+        for previous_field, value in zip(ordering[:index], position):
+            condition &= Q(**{previous_field.lstrip("-"): value})
+
+        keyset_filter |= condition
+
+    return keyset_filter
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor pagination keyed on the values of a unique ordering.
+
+    Pages are selected with a keyset filter instead of an offset,
+    so there is no COUNT query and deep pages cost as much as the first one.
+    """
     page_size_query_param = "page_size"
     max_page_size = 100
 
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._get_page_queryset(queryset, request, view)
+
+        if queryset is None:
+            return None
+
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Fetch the page with the async ORM, for the async views"""
+        queryset = self._get_page_queryset(queryset, request, view)
+
+        if queryset is None:
+            return None
+
+        return self._set_page([instance async for instance in queryset])
+
+    def _get_page_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None:
+            self.cursor["position"] = self._parse_position(
+                queryset.model,
+                self.cursor["position"],
+            )
+
+        reverse = self.cursor is not None and self.cursor["reverse"]
+        ordering = (
+            [self._invert(field) for field in self.ordering]
+            if reverse else list(self.ordering)
+        )
+        return self.select_page(
+            queryset,
+            ordering,
+            None if self.cursor is None else self.cursor["position"],
+            self.page_size + 1,
+        )
+
+    def select_page(self, queryset, ordering, position, limit):
+        """Return the first objects after the position, if any"""
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            queryset = queryset.filter(get_keyset_filter(ordering, position))
+
+        return queryset[:limit]
+
+    def _set_page(self, results):
+        reverse = self.cursor is not None and self.cursor["reverse"]
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(
+            {"position": self._get_position(self.page[-1]), "reverse": False}
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(
+            {"position": self._get_position(self.page[0]), "reverse": True}
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+            position = cursor["p"]
+            reverse = bool(cursor.get("r"))
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeEncodeError,
+            binascii.Error,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "reverse": reverse}
+
+    def encode_cursor(self, cursor):
+        data = {"p": cursor["position"]}
+
+        if cursor["reverse"]:
+            data["r"] = 1
+
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def _parse_position(self, model, position):
+        """Convert the cursor values to the types of the ordering fields"""
+        values = []
+
+        for field, value in zip(self.ordering, position):
+            try:
+                if value is None:
+                    raise ValueError
+
+                values.append(
+                    model._meta.get_field(field.lstrip("-")).to_python(value)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        return values
+
+    def _get_position(self, instance):
+        position = []
+
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+
+            if isinstance(value, datetime):
+                value = value.isoformat()
+
+            position.append(value)
+
+        return position
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class ProfilePagination(KeysetPagination):
+    page_size = 10
+    ordering = ("username", "id")
+
 
 class HashtagPagination(PageNumberPagination):
     page_size = 10
@@ -13,7 +212,31 @@ class HashtagPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class PostPagination(PageNumberPagination):
+class SearchPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class FeedPagination(PageNumberPagination):
+    """Pages through the cached ids of a ranked feed"""
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class PostPagination(KeysetPagination):
+    page_size = 5
+    ordering = ("-created_at", "-id")
+
+
+class TimelinePagination(PostPagination):
+    """Pages through a timeline, which selects its pages itself"""
+
+    def select_page(self, timeline, ordering, position, limit):
+        return timeline.get_page(ordering, position, limit)
+
+
+class CommentPagination(KeysetPagination):
+    page_size = 10
+    ordering = ("-created_at", "-id")
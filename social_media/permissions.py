@@ -5,7 +5,7 @@ class IsProfileOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             True if request.method in SAFE_METHODS
-            else obj.user == request.user
+            else obj.user_id == request.user.id
         )
 
 
@@ -13,5 +13,5 @@ class IsPostOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             True if request.method in SAFE_METHODS
-            else obj.author == request.user.profile
+            else obj.author_id == request.user.profile.id
         )
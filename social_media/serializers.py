@@ -1,12 +1,94 @@
+from django.conf import settings
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 from social_media.models import (
+    extract_hashtag_names,
     Profile,
+    FollowSuggestion,
     Hashtag,
     Post,
     Comment,
 )
 
+FOLLOWS_PREVIEW_SIZE = 5
+LATEST_COMMENTS_SIZE = 3
+CONTENT_PREVIEW_LENGTH = 500
+BULK_ACTIONS_MAX_SIZE = 500
+EXTRACTED_HASHTAGS_MAX_SIZE = 30
+AUTOCOMPLETE_SIZE = 10
+AUTOCOMPLETE_MAX_SIZE = 50
+
+
+class ImageVariantField(serializers.ImageField):
+    """Image of the instance as the URL of one of its processed variants"""
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        name = value.image_variants.get(self.variant)
+
+        # The variants of the new images are not processed yet
+        if not name:
+            return super().to_representation(value.image)
+
+        url = value.image.storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class ImageVariantsField(serializers.DictField):
+    """URLs of all the processed variants of the image of the instance"""
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["child"] = serializers.URLField()
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        urls = {}
+
+        for variant, name in value.image_variants.items():
+            url = value.image.storage.url(name)
+            urls[variant] = request.build_absolute_uri(url) if request else url
+
+        return urls
+
+
+def bulk_ids_field():
+    return serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        max_length=BULK_ACTIONS_MAX_SIZE,
+    )
+
+
+def validate_bulk_actions(data, action, reverse_action):
+    if not data[action] and not data[reverse_action]:
+        raise serializers.ValidationError(
+            f"Provide at least one id to {action} or {reverse_action}."
+        )
+
+    if set(data[action]) & set(data[reverse_action]):
+        raise serializers.ValidationError(
+            f"The same id cannot be used to {action} and {reverse_action}."
+        )
+
+    return data
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    search = serializers.CharField(max_length=255)
+
 
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,6 +109,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 
 class ProfileListSerializer(serializers.ModelSerializer):
     followers_count = serializers.IntegerField(read_only=True)
+    image = ImageVariantField("small")
 
     class Meta:
         model = Profile
@@ -40,17 +123,23 @@ class ProfileListSerializer(serializers.ModelSerializer):
         )
 
 
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    suggested = ProfileListSerializer(read_only=True)
+
+    class Meta:
+        model = FollowSuggestion
+        fields = (
+            "suggested",
+            "score",
+            "mutual_followings_count",
+            "shared_hashtags_count",
+        )
+
+
 class ProfileDetailSerializer(serializers.ModelSerializer):
-    followings = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="username",
-    )
-    followers = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="username",
-    )
+    followings_preview = serializers.SerializerMethodField()
+    followers_preview = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Profile
@@ -60,11 +149,54 @@ class ProfileDetailSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "bio",
-            "followings",
-            "followers",
+            "followings_count",
+            "followers_count",
+            "followings_preview",
+            "followers_preview",
             "image",
+            "image_variants",
+        )
+
+    @staticmethod
+    def _get_preview(obj, name):
+        # The async view prefetches the previews, the sync one queries them
+        profiles = getattr(obj, f"{name}_preview_profiles", None)
+
+        if profiles is not None:
+            return [profile.username for profile in profiles]
+
+        return list(
+            getattr(obj, name)
+            .order_by("username")
+            .values_list("username", flat=True)[:FOLLOWS_PREVIEW_SIZE]
         )
 
+    def get_followings_preview(self, obj) -> list[str]:
+        return self._get_preview(obj, "followings")
+
+    def get_followers_preview(self, obj) -> list[str]:
+        return self._get_preview(obj, "followers")
+
+
+class ProfileSearchSerializer(ProfileListSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ProfileListSerializer.Meta):
+        fields = ProfileListSerializer.Meta.fields + ("rank",)
+
+
+class ProfileBulkFollowSerializer(serializers.Serializer):
+    follow = bulk_ids_field()
+    unfollow = bulk_ids_field()
+
+    def validate(self, data):
+        profile = self.context["request"].user.profile
+
+        if profile.id in data["follow"]:
+            raise serializers.ValidationError("You cannot follow yourself.")
+
+        return validate_bulk_actions(data, "follow", "unfollow")
+
 
 class ProfileImageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -73,10 +205,75 @@ class ProfileImageSerializer(serializers.ModelSerializer):
 
 
 class HashtagSerializer(serializers.ModelSerializer):
+    # Lowercased like the names extracted from the posts
+    name = serializers.CharField(
+        max_length=255,
+        validators=[
+            UniqueValidator(Hashtag.objects.all(), lookup="iexact"),
+        ],
+    )
+
     class Meta:
         model = Hashtag
         fields = ("id", "name")
 
+    def validate_name(self, value):
+        return value.lower()
+
+
+class HashtagBulkSerializer(serializers.Serializer):
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=BULK_ACTIONS_MAX_SIZE,
+    )
+
+    def validate_names(self, value):
+        return [name.lower() for name in value]
+
+
+class HashtagAutocompleteQuerySerializer(serializers.Serializer):
+    prefix = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=AUTOCOMPLETE_MAX_SIZE,
+        default=AUTOCOMPLETE_SIZE,
+    )
+
+    def validate_prefix(self, value):
+        value = value.lstrip("#")
+
+        if not value:
+            raise serializers.ValidationError("The prefix cannot be empty.")
+
+        return value
+
+
+class HashtagAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ("id", "name", "posts_count")
+
+
+class HashtagTrendingQuerySerializer(serializers.Serializer):
+    window = serializers.ChoiceField(
+        choices=list(settings.TRENDING_WINDOWS),
+        default=settings.TRENDING_DEFAULT_WINDOW,
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.TRENDING_TOP_K,
+        default=10,
+    )
+
+
+class HashtagTrendingSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Hashtag
+        fields = ("id", "name", "score")
+
 
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -107,6 +304,14 @@ class CommentDetailSerializer(serializers.ModelSerializer):
         )
 
 
+class CommentSearchSerializer(CommentDetailSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(CommentDetailSerializer.Meta):
+        fields = ("id", "post", "author", "created_at", "rank", "headline")
+
+
 class CommentAddSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -129,6 +334,59 @@ class PostSerializer(serializers.ModelSerializer):
         data["author"] = profile
         return data
 
+    def create(self, validated_data):
+        hashtags = validated_data.pop("hashtags", [])
+
+        with transaction.atomic():
+            post = Post.objects.create(**validated_data)
+            post.hashtags.add(*self._get_hashtags(post, hashtags))
+
+        return post
+
+    def update(self, instance, validated_data):
+        hashtags = validated_data.pop("hashtags", None)
+        text_changed = (
+            "title" in validated_data or "content" in validated_data
+        )
+        old_names = set(self._extract_names(instance))
+
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+
+            if hashtags is not None or text_changed:
+                if hashtags is None:
+                    # The given hashtags stay, the ones tagged in the text
+                    # go when the #tag is edited out of it
+                    removed_names = old_names - set(
+                        self._extract_names(instance)
+                    )
+                    hashtags = [
+                        hashtag
+                        for hashtag in instance.hashtags.all()
+                        if hashtag.name.lower() not in removed_names
+                    ]
+
+                instance.hashtags.set(self._get_hashtags(instance, hashtags))
+
+        return instance
+
+    @staticmethod
+    def _extract_names(post):
+        return extract_hashtag_names(
+            post.title,
+            post.content,
+            limit=EXTRACTED_HASHTAGS_MAX_SIZE,
+        )
+
+    @classmethod
+    def _get_hashtags(cls, post, hashtags):
+        """
+        Add the hashtags tagged in the title and the content to the given
+        ones, getting or creating all of them at once
+        """
+        extracted, _ = Hashtag.get_or_create_many(cls._extract_names(post))
+        return {*hashtags, *extracted.values()}
+
 
 class PostListSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -141,8 +399,10 @@ class PostListSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="name",
     )
+    content = serializers.SerializerMethodField()
     likes_count = serializers.IntegerField(read_only=True)
     comments_count = serializers.IntegerField(read_only=True)
+    image = ImageVariantField("small")
 
     class Meta:
         model = Post
@@ -158,6 +418,13 @@ class PostListSerializer(serializers.ModelSerializer):
             "image",
         )
 
+    def get_content(self, obj) -> str:
+        """Return the preview annotated by the list queryset if present"""
+        if hasattr(obj, "content_preview"):
+            return obj.content_preview
+
+        return obj.content[:CONTENT_PREVIEW_LENGTH]
+
 
 class PostDetailSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -170,15 +437,8 @@ class PostDetailSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="name",
     )
-    likes = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="username",
-    )
-    comments = CommentDetailSerializer(
-        many=True,
-        read_only=True,
-    )
+    latest_comments = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Post
@@ -189,12 +449,47 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "content",
             "created_at",
             "hashtags",
-            "likes",
-            "comments",
+            "likes_count",
+            "comments_count",
+            "latest_comments",
             "image",
+            "image_variants",
+        )
+
+    @extend_schema_field(CommentDetailSerializer(many=True))
+    def get_latest_comments(self, obj):
+        # The async view prefetches the comments, the sync one queries them
+        comments = getattr(obj, "latest_comments_list", None)
+
+        if comments is None:
+            comments = (
+                obj.comments.select_related("author")[:LATEST_COMMENTS_SIZE]
+            )
+
+        return CommentDetailSerializer(comments, many=True).data
+
+
+class PostSearchSerializer(PostListSerializer):
+    rank = serializers.FloatField(read_only=True)
+    title_headline = serializers.CharField(read_only=True)
+    content_headline = serializers.CharField(read_only=True)
+
+    class Meta(PostListSerializer.Meta):
+        fields = PostListSerializer.Meta.fields + (
+            "rank",
+            "title_headline",
+            "content_headline",
         )
 
 
+class PostBulkLikeSerializer(serializers.Serializer):
+    like = bulk_ids_field()
+    unlike = bulk_ids_field()
+
+    def validate(self, data):
+        return validate_bulk_actions(data, "like", "unlike")
+
+
 class PostImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
@@ -0,0 +1,211 @@
+import functools
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from social_media.cache import (
+    invalidate,
+    invalidate_object,
+    list_scope,
+    object_scope,
+)
+from social_media.models import (
+    get_media_names,
+    Profile,
+    Hashtag,
+    Post,
+    Comment,
+    MediaBlob,
+)
+from social_media.timelines import fan_out_post, is_high_follower_author
+from social_media.trending import record_usage
+from user.denylist import revoke_user_tokens
+
+
+@receiver(pre_save, sender=Post)
+def skip_high_follower_fan_out(sender, instance, **kwargs):
+    # Decided once, so the post stays merged on read whatever the later
+    # follower count of its author
+    if instance.pk is None:
+        instance.fanout_skipped = is_high_follower_author(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, **kwargs):
+    if created and not instance.fanout_skipped:
+        transaction.on_commit(functools.partial(fan_out_post, instance))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    invalidate_object("post", instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def invalidate_post_hashtags(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    if isinstance(instance, Post):
+        invalidate_object("post", instance.pk)
+    else:
+        invalidate(list_scope("post"))
+
+        for post_id in pk_set or ():
+            invalidate_object("post", post_id)
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def update_hashtag_posts_counts(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, Post):
+        if action == "pre_clear":
+            pk_set = list(instance.hashtags.values_list("id", flat=True))
+        elif action not in ("post_add", "post_remove"):
+            return
+
+        Hashtag.update_posts_counts(pk_set, 1 if action == "post_add" else -1)
+    elif action in ("post_add", "post_remove"):
+        delta = len(pk_set) if action == "post_add" else -len(pk_set)
+        Hashtag.update_posts_counts([instance.pk], delta)
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def update_trending_hashtags(sender, instance, action, pk_set, **kwargs):
+    # Usages count at the creation of the post, so removing a hashtag
+    # takes back exactly what adding it has put into the scores
+    if isinstance(instance, Post):
+        if action == "pre_clear":
+            pk_set = instance.hashtags.values_list("id", flat=True)
+        elif action not in ("post_add", "post_remove"):
+            return
+
+        record_usage(
+            pk_set,
+            instance.created_at,
+            removed=action != "post_add",
+        )
+    elif action in ("post_add", "post_remove"):
+        for created_at in (
+            Post.objects.filter(pk__in=pk_set).values_list(
+                "created_at", flat=True
+            )
+        ):
+            record_usage(
+                [instance.pk],
+                created_at,
+                removed=action == "post_remove",
+            )
+
+
+@receiver(pre_delete, sender=Post)
+def remove_deleted_post_hashtags(sender, instance, **kwargs):
+    hashtag_ids = list(instance.hashtags.values_list("id", flat=True))
+    Hashtag.update_posts_counts(hashtag_ids, -1)
+    record_usage(hashtag_ids, instance.created_at, removed=True)
+
+
+MEDIA_FIELDS = {"image", "image_variants"}
+
+
+@receiver(pre_save, sender=Profile)
+@receiver(pre_save, sender=Post)
+def remember_media_names(sender, instance, update_fields, **kwargs):
+    instance._old_media_names = None
+
+    if instance.pk is None:
+        instance._old_media_names = set()
+    elif update_fields is None or MEDIA_FIELDS & set(update_fields):
+        old = (
+            sender.objects
+            .filter(pk=instance.pk)
+            .only(*MEDIA_FIELDS)
+            .first()
+        )
+        instance._old_media_names = get_media_names(old) if old else set()
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Post)
+def update_media_references(sender, instance, **kwargs):
+    old_names = getattr(instance, "_old_media_names", None)
+
+    if old_names is None:
+        return
+
+    new_names = get_media_names(instance)
+    MediaBlob.acquire(new_names - old_names)
+    MediaBlob.release(old_names - new_names)
+    instance._old_media_names = None
+
+
+@receiver(pre_delete, sender=Profile)
+@receiver(pre_delete, sender=Post)
+def release_deleted_media(sender, instance, **kwargs):
+    MediaBlob.release(get_media_names(instance))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    invalidate_object("post", instance.post_id)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile(sender, instance, **kwargs):
+    invalidate_object("profile", instance.pk)
+    invalidate(list_scope("post"))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_author(sender, instance, created, **kwargs):
+    # The cached posts show the username of their author and commenters,
+    # and depend on this scope; the posts of a deleted profile go with it
+    if not created:
+        invalidate(object_scope("author", instance.pk))
+
+
+@receiver(pre_save, sender=Profile)
+def remember_renaming(sender, instance, update_fields, **kwargs):
+    instance._renamed = (
+        instance.pk is not None
+        and (update_fields is None or "username" in update_fields)
+        and not sender.objects.filter(
+            pk=instance.pk,
+            username=instance.username,
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_usernames(sender, instance, **kwargs):
+    # A rename or a deletion can change the follows previews of any
+    # cached profile, which depend on this one scope rather than
+    # bumping the scopes of every follower and following
+    if "created" in kwargs and not instance._renamed:
+        return
+
+    invalidate(list_scope("username"))
+
+
+@receiver(post_delete, sender=Profile)
+def revoke_profile_tokens(sender, instance, **kwargs):
+    # The tokens of the user still claim the deleted profile
+    revoke_user_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=Hashtag)
+@receiver(post_delete, sender=Hashtag)
+def invalidate_hashtag(sender, instance, **kwargs):
+    # The cached posts showing the hashtag depend on its scope
+    invalidate_object("hashtag", instance.pk)
+    invalidate(list_scope("post"))
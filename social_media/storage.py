@@ -0,0 +1,47 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+BLOBS_DIRECTORY = "blobs"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming every file after the SHA-256 of its content,
+    so the same content is stored once however many times it is uploaded.
+
+    Only the extension of the requested name is kept. The stored files are
+    shared, so they are never deleted by the models but reference-counted
+    by MediaBlob and purged by the collect_media_garbage command.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+
+        for chunk in content.chunks():
+            digest.update(chunk)
+
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        _, extension = os.path.splitext(name)
+        name = "/".join(
+            (
+                BLOBS_DIRECTORY,
+                hexdigest[:2],
+                hexdigest[2:4],
+                f"{hexdigest}{extension.lower()}",
+            )
+        )
+
+        if self.exists(name):
+            return name
+
+        return self._save(name, content)
@@ -0,0 +1,133 @@
+import heapq
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from social_media.models import FollowSuggestion, Profile, Post
+
+CHUNK_SIZE = 10000
+BATCH_SIZE = 5000
+
+# Only the best friends of friends by mutual followings are checked
+# for shared hashtags
+CANDIDATES_FACTOR = 5
+
+
+def load_adjacency(queryset, source_field, target_field):
+    """
+    Stream the pairs of ids ordered by the source and return
+    the targets of every source as a compact array of ids
+    """
+    adjacency = {}
+    current_id = None
+    targets = None
+    rows = (
+        queryset
+        .order_by(source_field, target_field)
+        .values_list(source_field, target_field)
+        .distinct()
+    )
+
+    for source_id, target_id in rows.iterator(chunk_size=CHUNK_SIZE):
+        if source_id != current_id:
+            current_id = source_id
+            targets = adjacency[source_id] = array("q")
+
+        targets.append(target_id)
+
+    return adjacency
+
+
+def load_liked_hashtags():
+    """Return the ids of the hashtags of the posts liked by every profile"""
+    return load_adjacency(
+        Post.likes.through.objects.filter(post__hashtags__isnull=False),
+        "profile_id",
+        "post__hashtags",
+    )
+
+
+def suggest_for(profile_id, followings, liked_hashtags):
+    """
+    Rank the friends of friends of the profile by the number of its
+    followings following them and of the liked hashtags they share
+    """
+    own_followings = followings.get(profile_id, ())
+    mutual_counts = Counter()
+
+    for following_id in own_followings:
+        mutual_counts.update(followings.get(following_id, ()))
+
+    mutual_counts.pop(profile_id, None)
+
+    for following_id in own_followings:
+        mutual_counts.pop(following_id, None)
+
+    size = settings.FOLLOW_SUGGESTIONS_SIZE
+    own_hashtags = set(liked_hashtags.get(profile_id, ()))
+    scored = []
+
+    for suggested_id, mutual_count in mutual_counts.most_common(
+        size * CANDIDATES_FACTOR
+    ):
+        shared_count = (
+            len(own_hashtags.intersection(liked_hashtags[suggested_id]))
+            if own_hashtags and suggested_id in liked_hashtags
+            else 0
+        )
+        scored.append(
+            (
+                mutual_count
+                + settings.FOLLOW_SUGGESTIONS_HASHTAG_WEIGHT * shared_count,
+                suggested_id,
+                mutual_count,
+                shared_count,
+            )
+        )
+
+    return heapq.nlargest(size, scored)
+
+
+def compute_follow_suggestions():
+    """
+    Walk the whole follow graph in memory and replace the stored
+    suggestions, return the number of the stored ones
+    """
+    followings = load_adjacency(
+        Profile.followings.through.objects.all(),
+        "from_profile_id",
+        "to_profile_id",
+    )
+    liked_hashtags = load_liked_hashtags()
+    stored = 0
+
+    with transaction.atomic():
+        FollowSuggestion.objects.all().delete()
+
+        batch = []
+
+        for profile_id in followings:
+            for score, suggested_id, mutual_count, shared_count in (
+                suggest_for(profile_id, followings, liked_hashtags)
+            ):
+                batch.append(
+                    FollowSuggestion(
+                        profile_id=profile_id,
+                        suggested_id=suggested_id,
+                        score=score,
+                        mutual_followings_count=mutual_count,
+                        shared_hashtags_count=shared_count,
+                    )
+                )
+
+            if len(batch) >= BATCH_SIZE:
+                FollowSuggestion.objects.bulk_create(batch)
+                stored += len(batch)
+                batch = []
+
+        FollowSuggestion.objects.bulk_create(batch)
+        stored += len(batch)
+
+    return stored
@@ -0,0 +1,181 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.models import Profile, Hashtag, Post, Comment
+
+ASYNC_POST_LIST_URL = reverse("social_media:async-post-list")
+ASYNC_SUBSCRIPTIONS_ONLY_URL = reverse(
+    "social_media:async-post-subscriptions-only"
+)
+MISSING_ID = 10 ** 9
+
+
+def create_posts(author, count=7):
+    hashtag, _ = Hashtag.objects.get_or_create(name="async")
+    posts = []
+
+    for i in range(count):
+        post = Post.objects.create(
+            author=author,
+            title=f"Title {i}",
+            content=f"Content {i}",
+        )
+        post.hashtags.add(hashtag)
+        posts.append(post)
+
+    return posts
+
+
+class AsyncApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.author = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "author@test.com",
+                "test_pass",
+            ),
+            username="author",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def assert_same_as_sync(self, async_url, sync_url):
+        async_res = self.client.get(async_url)
+        sync_res = self.client.get(sync_url)
+
+        self.assertEquals(async_res.status_code, status.HTTP_200_OK)
+        async_data, sync_data = async_res.json(), sync_res.json()
+
+        # The page links differ by the path of the view only
+        if "results" in sync_data:
+            async_data, sync_data = async_data["results"], sync_data["results"]
+
+        self.assertEquals(async_data, sync_data)
+        return async_res.json()
+
+    def test_auth_required(self):
+        res = APIClient().get(ASYNC_POST_LIST_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", res["WWW-Authenticate"])
+
+    def test_invalid_token_is_rejected(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+
+        res = client.get(ASYNC_POST_LIST_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_only_reads_are_allowed(self):
+        res = self.client.post(ASYNC_POST_LIST_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_list_posts(self):
+        posts = create_posts(self.author)
+
+        data = self.assert_same_as_sync(
+            ASYNC_POST_LIST_URL,
+            reverse("social_media:post-list"),
+        )
+
+        self.assertEquals(data["results"][0]["id"], posts[-1].id)
+        self.assertEquals(data["results"][0]["hashtags"], ["async"])
+
+    def test_list_posts_next_page(self):
+        create_posts(self.author)
+        first_page = self.client.get(ASYNC_POST_LIST_URL).json()
+
+        res = self.client.get(first_page["next"])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.json()["results"]), 2)
+
+    def test_list_posts_filtered(self):
+        create_posts(self.author)
+        create_posts(self.profile, count=1)
+
+        data = self.assert_same_as_sync(
+            f"{ASYNC_POST_LIST_URL}?author={self.profile.id}",
+            f"{reverse('social_media:post-list')}?author={self.profile.id}",
+        )
+
+        self.assertEquals(len(data["results"]), 1)
+
+    def test_retrieve_post(self):
+        post = create_posts(self.author, count=1)[0]
+
+        for i in range(5):
+            Comment.objects.create(
+                author=self.profile,
+                post=post,
+                content=f"Comment {i}",
+            )
+
+        data = self.assert_same_as_sync(
+            reverse("social_media:async-post-detail", args=[post.id]),
+            reverse("social_media:post-detail", args=[post.id]),
+        )
+
+        self.assertEquals(data["latest_comments"][0]["content"], "Comment 4")
+
+    def test_retrieve_missing_post(self):
+        res = self.client.get(
+            reverse("social_media:async-post-detail", args=[MISSING_ID])
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_profile(self):
+        self.profile.follow(self.author)
+
+        data = self.assert_same_as_sync(
+            reverse("social_media:async-profile-detail", args=[self.author.id]),
+            reverse("social_media:profile-detail", args=[self.author.id]),
+        )
+
+        self.assertEquals(data["followers_preview"], ["test_user"])
+
+    def test_list_subscription_posts(self):
+        self.client.post(
+            reverse("social_media:profile-follow-user", args=[self.author.id])
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_posts(self.author)
+
+        data = self.assert_same_as_sync(
+            ASYNC_SUBSCRIPTIONS_ONLY_URL,
+            reverse("social_media:post-show-posts-from-subscriptions-only"),
+        )
+
+        self.assertEquals(len(data["results"]), 5)
+
+    def test_cached_post_list_is_invalidated(self):
+        create_posts(self.author)
+        self.client.get(ASYNC_POST_LIST_URL)
+        post = Post.objects.create(
+            author=self.author,
+            title="Newest",
+            content="Content",
+        )
+
+        res = self.client.get(ASYNC_POST_LIST_URL)
+
+        self.assertEquals(res.json()["results"][0]["id"], post.id)
@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from social_media.models import Profile, Post, Comment
+
+
+class ReconcileCountersCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.profile = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "test@test.com",
+                "test_pass",
+            ),
+            username="test_user",
+        )
+        self.follower = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "follower@test.com",
+                "test_pass",
+            ),
+            username="follower",
+        )
+        self.post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+
+    def test_reconcile_counters_fixes_drift(self):
+        self.post.likes.add(self.profile, self.follower)
+        Comment.objects.create(
+            author=self.follower,
+            post=self.post,
+            content="Content",
+        )
+        self.profile.followers.add(self.follower)
+        Post.objects.filter(pk=self.post.pk).update(likes_count=7)
+
+        call_command("reconcile_counters", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.follower.refresh_from_db()
+
+        self.assertEquals(self.post.likes_count, 2)
+        self.assertEquals(self.post.comments_count, 1)
+        self.assertEquals(self.profile.followers_count, 1)
+        self.assertEquals(self.follower.followings_count, 1)
@@ -0,0 +1,62 @@
+import copy
+
+from django.db import Error, connection
+from django.test import TestCase
+
+from social_media_api.db.pooled.base import DatabaseWrapper, close_pools
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self) -> None:
+        self.wrappers = []
+
+    def tearDown(self) -> None:
+        for wrapper in self.wrappers:
+            wrapper.close()
+
+        close_pools()
+
+    def create_wrapper(self, **pool_options):
+        settings_dict = copy.deepcopy(connection.settings_dict)
+        settings_dict["OPTIONS"]["pool"] = pool_options
+        settings_dict["CONN_MAX_AGE"] = 0
+        wrapper = DatabaseWrapper(settings_dict, alias=connection.alias)
+        self.wrappers.append(wrapper)
+        return wrapper
+
+    @staticmethod
+    def get_backend_pid(wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_closed_connection_goes_back_to_pool(self):
+        wrapper = self.create_wrapper(max_size=2)
+        backend_pid = self.get_backend_pid(wrapper)
+
+        wrapper.close_if_unusable_or_obsolete()
+
+        self.assertIsNone(wrapper.connection)
+        self.assertEquals(self.get_backend_pid(wrapper), backend_pid)
+
+    def test_concurrent_connections_are_distinct(self):
+        first, second = self.create_wrapper(), self.create_wrapper()
+
+        self.assertNotEquals(
+            self.get_backend_pid(first),
+            self.get_backend_pid(second),
+        )
+
+    def test_broken_connection_is_replaced(self):
+        wrapper = self.create_wrapper(max_size=1)
+        backend_pid = self.get_backend_pid(wrapper)
+        wrapper.connection.close()
+        wrapper.close()
+
+        self.assertNotEquals(self.get_backend_pid(wrapper), backend_pid)
+
+    def test_exhausted_pool_times_out(self):
+        self.get_backend_pid(self.create_wrapper(max_size=1, timeout=0.1))
+
+        with self.assertRaises(Error):
+            self.get_backend_pid(self.create_wrapper())
@@ -0,0 +1,300 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.models import Hashtag, HashtagTrend, Profile, Post
+
+HASHTAG_URL = reverse("social_media:hashtag-list")
+BULK_HASHTAG_URL = reverse("social_media:hashtag-bulk-create-hashtags")
+AUTOCOMPLETE_URL = reverse("social_media:hashtag-autocomplete-hashtags")
+TRENDING_URL = reverse("social_media:hashtag-show-trending-hashtags")
+
+
+class UnauthenticatedHashtagApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(HASHTAG_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedHashtagApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_hashtags(self):
+        existing = Hashtag.objects.create(name="django")
+        payload = {"names": ["django", "python", "api", "python"]}
+
+        res = self.client.post(BULK_HASHTAG_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [
+                (item["name"], item["created"])
+                for item in res.data["results"]
+            ],
+            [("django", False), ("python", True), ("api", True)],
+        )
+        self.assertEquals(res.data["results"][0]["id"], existing.id)
+        self.assertEquals(Hashtag.objects.count(), 3)
+
+    def test_bulk_create_hashtags_query_count(self):
+        Hashtag.objects.create(name="django")
+        payload = {"names": [f"tag{i}" for i in range(50)] + ["django"]}
+
+        # existing hashtags, bulk insert, created hashtags
+        with self.assertNumQueries(3):
+            self.client.post(BULK_HASHTAG_URL, payload, format="json")
+
+
+    def test_bulk_create_hashtags_ignores_case(self):
+        existing = Hashtag.objects.create(name="Django")
+        payload = {"names": ["DJANGO", "Python"]}
+
+        res = self.client.post(BULK_HASHTAG_URL, payload, format="json")
+
+        self.assertEquals(
+            [
+                (item["id"], item["name"], item["created"])
+                for item in res.data["results"]
+            ],
+            [
+                (existing.id, "django", False),
+                (Hashtag.objects.get(name="python").id, "python", True),
+            ],
+        )
+        self.assertEquals(Hashtag.objects.count(), 2)
+
+    def test_create_hashtag_ignores_case(self):
+        res = self.client.post(HASHTAG_URL, {"name": "Django"})
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(res.data["name"], "django")
+
+        res = self.client.post(HASHTAG_URL, {"name": "DJANGO"})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+class HashtagAutocompleteApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_post(self, *hashtags):
+        post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+        post.hashtags.add(*hashtags)
+        return post
+
+    def test_autocomplete_ranks_matches_by_popularity(self):
+        django = Hashtag.objects.create(name="Django")
+        djangorest = Hashtag.objects.create(name="djangorest")
+        python = Hashtag.objects.create(name="python")
+        Hashtag.objects.create(name="dj")
+        Hashtag.objects.create(name="a_django")
+        self.create_post(djangorest, python)
+        self.create_post(djangorest)
+        self.create_post(django)
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"prefix": "#djang"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [
+                (item["name"], item["posts_count"])
+                for item in res.data["results"]
+            ],
+            [("djangorest", 2), ("Django", 1)],
+        )
+
+    def test_autocomplete_escapes_wildcards(self):
+        Hashtag.objects.create(name="a_b")
+        Hashtag.objects.create(name="axb")
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"prefix": "a_"})
+
+        self.assertEquals(
+            [item["name"] for item in res.data["results"]],
+            ["a_b"],
+        )
+
+    def test_autocomplete_requires_a_prefix(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"prefix": "#"})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_posts_count_follows_the_posts(self):
+        django = Hashtag.objects.create(name="django")
+        post = self.create_post(django)
+        self.create_post(django)
+
+        post.hashtags.clear()
+        django.refresh_from_db()
+        self.assertEquals(django.posts_count, 1)
+
+        post.hashtags.add(django)
+        post.delete()
+        django.refresh_from_db()
+        self.assertEquals(django.posts_count, 1)
+
+    def test_autocomplete_uses_prefix_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = (
+            Hashtag.objects
+            .filter(name__istartswith="dj")
+            .order_by("-posts_count", "name")
+            .explain()
+        )
+
+        self.assertIn("hashtag_name_prefix_idx", plan)
+
+
+class TrendingHashtagApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.client.force_authenticate(self.user)
+        self.django = Hashtag.objects.create(name="django")
+        self.python = Hashtag.objects.create(name="python")
+        self.rust = Hashtag.objects.create(name="rust")
+
+    def tag_post(self, *hashtags, age=timedelta()):
+        post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+        Post.objects.filter(pk=post.pk).update(
+            created_at=timezone.now() - age
+        )
+        post.refresh_from_db()
+        post.hashtags.add(*hashtags)
+        return post
+
+    def get_scores(self, window="24h"):
+        res = self.client.get(TRENDING_URL, {"window": window})
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return {item["name"]: item["score"] for item in res.data["results"]}
+
+    def test_trending_hashtags_are_ranked_by_usage(self):
+        self.tag_post(self.django, self.python)
+        self.tag_post(self.django)
+        self.tag_post(self.django, self.python)
+        self.tag_post(self.rust)
+
+        res = self.client.get(TRENDING_URL, {"limit": 2})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["window"], "24h")
+        self.assertEquals(
+            [item["name"] for item in res.data["results"]],
+            ["django", "python"],
+        )
+        self.assertAlmostEqual(res.data["results"][0]["score"], 3, places=2)
+
+    def test_older_usages_decay(self):
+        for _ in range(3):
+            self.tag_post(self.django, age=timedelta(days=1))
+
+        self.tag_post(self.python)
+
+        hourly = self.get_scores("1h")
+        cache.clear()
+        daily = self.get_scores("24h")
+
+        self.assertGreater(hourly["python"], hourly["django"])
+        self.assertGreater(daily["django"], daily["python"])
+        self.assertAlmostEqual(daily["django"], 1.5, places=2)
+
+    def test_removed_hashtags_are_taken_out_of_the_scores(self):
+        post = self.tag_post(self.django, self.python)
+        self.tag_post(self.python)
+
+        post.hashtags.remove(self.python)
+        post.hashtags.add(self.rust)
+        scores = self.get_scores()
+
+        self.assertAlmostEqual(scores["python"], 1, places=2)
+        self.assertAlmostEqual(scores["rust"], 1, places=2)
+
+        post.delete()
+        cache.clear()
+        scores = self.get_scores()
+
+        self.assertAlmostEqual(scores["django"], 0, places=2)
+        self.assertAlmostEqual(scores["rust"], 0, places=2)
+
+    def test_trending_ranking_is_cached(self):
+        self.tag_post(self.django)
+        self.client.get(TRENDING_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TRENDING_URL)
+
+        self.assertEquals(res.data["results"][0]["name"], "django")
+
+    def test_unknown_window_is_rejected(self):
+        res = self.client.get(TRENDING_URL, {"window": "1y"})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recompute_matches_incremental_scores(self):
+        self.tag_post(self.django, self.python, age=timedelta(hours=3))
+        self.tag_post(self.django, age=timedelta(hours=30))
+        self.tag_post(self.rust)
+        incremental = dict(
+            HashtagTrend.objects
+            .filter(window="24h")
+            .values_list("hashtag_id", "log_score")
+        )
+
+        call_command("recompute_trending_hashtags", stdout=StringIO())
+        recomputed = dict(
+            HashtagTrend.objects
+            .filter(window="24h")
+            .values_list("hashtag_id", "log_score")
+        )
+
+        self.assertEquals(recomputed.keys(), incremental.keys())
+
+        for hashtag_id, log_score in incremental.items():
+            self.assertAlmostEqual(recomputed[hashtag_id], log_score)
@@ -0,0 +1,451 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import signing
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.images import enqueue_image_processing, process_next_task
+from social_media.models import (
+    get_media_names,
+    Profile,
+    Post,
+    ImageTask,
+    MediaBlob,
+)
+from social_media.uploads import UPLOAD_TOKEN_SALT
+
+MEDIA_ROOT = tempfile.mkdtemp()
+POST_LIST_URL = reverse("social_media:post-list")
+
+
+def create_image_data(size=(2000, 1000)):
+    image = Image.new("RGB", size, color=(200, 100, 50))
+    exif = Image.Exif()
+    exif[0x010F] = "Camera Maker"
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def create_image_file(size=(2000, 1000)):
+    return SimpleUploadedFile(
+        "photo.jpg",
+        create_image_data(size),
+        content_type="image/jpeg",
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageProcessingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+        self.upload_url = reverse(
+            "social_media:post-upload-image",
+            args=[self.post.id],
+        )
+
+    def test_upload_queues_the_image(self):
+        res = self.client.post(
+            self.upload_url,
+            {"image": create_image_file()},
+            format="multipart",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        task = ImageTask.objects.get()
+        self.assertEquals(task.status, ImageTask.Status.PENDING)
+        self.assertEquals(task.image, self.post.image.name)
+        self.assertEquals(self.post.image_variants, {})
+
+    def test_worker_generates_stripped_variants(self):
+        self.client.post(
+            self.upload_url,
+            {"image": create_image_file()},
+            format="multipart",
+        )
+
+        call_command("process_images", "--once", stdout=StringIO())
+
+        self.assertEquals(
+            ImageTask.objects.get().status,
+            ImageTask.Status.DONE,
+        )
+        self.post.refresh_from_db()
+        self.assertEquals(
+            set(self.post.image_variants),
+            {
+                "small",
+                "small_webp",
+                "medium",
+                "medium_webp",
+                "large",
+                "large_webp",
+            },
+        )
+
+        with default_storage.open(self.post.image.name) as file:
+            original = Image.open(file)
+            self.assertEquals(original.size, (2000, 1000))
+            self.assertEquals(len(original.getexif()), 0)
+
+        with default_storage.open(self.post.image_variants["small"]) as file:
+            self.assertEquals(Image.open(file).size, (320, 160))
+
+        with default_storage.open(
+            self.post.image_variants["large_webp"]
+        ) as file:
+            variant = Image.open(file)
+            self.assertEquals(variant.format, "WEBP")
+            self.assertEquals(variant.size, (1600, 800))
+
+    def test_list_returns_small_variant(self):
+        self.client.post(
+            self.upload_url,
+            {"image": create_image_file()},
+            format="multipart",
+        )
+        self.post.refresh_from_db()
+
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertTrue(
+            res.data["results"][0]["image"].endswith(self.post.image.name)
+        )
+
+        process_next_task()
+        self.post.refresh_from_db()
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertTrue(
+            res.data["results"][0]["image"].endswith(
+                self.post.image_variants["small"]
+            )
+        )
+
+    def test_invalid_image_fails_after_retries(self):
+        self.post.image = SimpleUploadedFile("broken.jpg", b"not an image")
+        self.post.save()
+        ImageTask.objects.create(
+            model_name="post",
+            object_id=self.post.id,
+            image=self.post.image.name,
+        )
+
+        call_command(
+            "process_images",
+            "--once",
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+
+        task = ImageTask.objects.get()
+        self.assertEquals(task.status, ImageTask.Status.FAILED)
+        self.assertEquals(task.attempts, 3)
+        self.assertIn("UnidentifiedImageError", task.error)
+
+    def test_malformed_exif_fails_after_retries(self):
+        exif = (
+            b"Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x02"
+            # A resolution unit stored as a string instead of a short
+            b"\x01\x28\x00\x02\x00\x00\x00\x04Cam\x00"
+            b"\x01\x12\x00\x03\x00\x00\x00\x01\x00\x06\x00\x00"
+            b"\x00\x00\x00\x00"
+        )
+        buffer = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(buffer, "JPEG", exif=exif)
+        self.post.image = SimpleUploadedFile("exif.jpg", buffer.getvalue())
+        self.post.save()
+        enqueue_image_processing(self.post)
+
+        call_command(
+            "process_images",
+            "--once",
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+
+        task = ImageTask.objects.get()
+        self.assertEquals(task.status, ImageTask.Status.FAILED)
+        self.assertEquals(task.attempts, 3)
+        self.assertIn("error: required argument", task.error)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BoundedImageUploadTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.upload_url = reverse(
+            "social_media:profile-upload-image",
+            args=[self.profile.id],
+        )
+        self.token_url = reverse(
+            "social_media:profile-upload-image-token",
+            args=[self.profile.id],
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024)
+    def test_upload_bigger_than_byte_limit_is_rejected(self):
+        res = self.client.post(
+            self.upload_url,
+            {"image": create_image_file()},
+            format="multipart",
+        )
+
+        self.assertEquals(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+        self.assertFalse(ImageTask.objects.exists())
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024)
+    def test_other_multipart_requests_are_not_bounded(self):
+        res = self.client.post(
+            POST_LIST_URL,
+            {
+                "title": "Title",
+                "content": "Content",
+                "attachment": create_image_file(),
+            },
+            format="multipart",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=100 * 100)
+    def test_upload_with_too_many_pixels_is_rejected(self):
+        res = self.client.post(
+            self.upload_url,
+            {"image": create_image_file(size=(101, 100))},
+            format="multipart",
+        )
+
+        self.assertEquals(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+        self.assertIn("pixels", res.data["detail"])
+
+    def get_upload_url(self):
+        res = self.client.post(self.token_url)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return res.data["upload_url"]
+
+    def test_upload_with_token(self):
+        upload_url = self.get_upload_url()
+        client = APIClient()
+
+        res = client.put(
+            upload_url,
+            create_image_data(),
+            content_type="image/jpeg",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.image.name.endswith(".jpg"))
+        self.assertEquals(ImageTask.objects.get().object_id, self.profile.id)
+
+        res = client.put(
+            upload_url,
+            create_image_data(),
+            content_type="image/jpeg",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_upload_with_forged_token_is_rejected(self):
+        token = signing.dumps(
+            {"model": "profile", "pk": self.profile.id, "image": ""},
+            salt="another salt",
+        )
+
+        res = APIClient().put(
+            reverse("social_media:image-upload", args=[token]),
+            create_image_data(),
+            content_type="image/jpeg",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_upload_token_rejects_non_images(self):
+        token = signing.dumps(
+            {"model": "profile", "pk": self.profile.id, "image": ""},
+            salt=UPLOAD_TOKEN_SALT,
+        )
+
+        res = APIClient().put(
+            reverse("social_media:image-upload", args=[token]),
+            b"not an image",
+            content_type="image/png",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024)
+    def test_upload_with_token_is_bounded(self):
+        res = APIClient().put(
+            self.get_upload_url(),
+            create_image_data(),
+            content_type="image/jpeg",
+        )
+
+        self.assertEquals(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    def test_upload_token_requires_the_owner(self):
+        stranger = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "stranger@test.com",
+                "test_pass",
+            ),
+            username="stranger",
+        )
+
+        res = self.client.post(
+            reverse(
+                "social_media:profile-upload-image-token",
+                args=[stranger.id],
+            )
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaStorageTests(TestCase):
+    def setUp(self) -> None:
+        self.profile = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "test@test.com",
+                "test_pass",
+            ),
+            username="test_user",
+        )
+
+    def create_post(self, image_data):
+        return Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+            image=SimpleUploadedFile("photo.jpg", image_data),
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        image_data = create_image_data()
+
+        first = self.create_post(image_data)
+        second = self.create_post(image_data)
+
+        self.assertEquals(first.image.name, second.image.name)
+        self.assertEquals(MediaBlob.objects.get().refcount, 2)
+
+    def test_replaced_and_deleted_images_are_released(self):
+        post = self.create_post(create_image_data())
+        old_name = post.image.name
+
+        post.image = SimpleUploadedFile(
+            "other.jpg",
+            create_image_data(size=(100, 100)),
+        )
+        post.save()
+
+        self.assertEquals(MediaBlob.objects.get(name=old_name).refcount, 0)
+        self.assertEquals(
+            MediaBlob.objects.get(name=post.image.name).refcount,
+            1,
+        )
+
+        post.delete()
+
+        self.assertFalse(MediaBlob.objects.filter(refcount__gt=0).exists())
+
+    def test_processed_image_references_its_variants(self):
+        post = self.create_post(create_image_data())
+        enqueue_image_processing(post)
+
+        process_next_task()
+        post.refresh_from_db()
+
+        self.assertEquals(
+            MediaBlob.objects.filter(refcount=1).count(),
+            len(get_media_names(post)),
+        )
+
+    def test_garbage_collection_purges_old_orphans_only(self):
+        post = self.create_post(create_image_data())
+        orphan = self.create_post(create_image_data(size=(100, 100)))
+        orphan_name = orphan.image.name
+        orphan.delete()
+
+        call_command("collect_media_garbage", stdout=StringIO())
+
+        self.assertTrue(default_storage.exists(orphan_name))
+
+        call_command(
+            "collect_media_garbage",
+            "--grace-period=0",
+            stdout=StringIO(),
+        )
+
+        self.assertFalse(default_storage.exists(orphan_name))
+        self.assertFalse(MediaBlob.objects.filter(name=orphan_name).exists())
+        self.assertTrue(default_storage.exists(post.image.name))
+
+    def test_reconcile_fixes_reference_counts(self):
+        post = self.create_post(create_image_data())
+        MediaBlob.objects.all().delete()
+
+        call_command(
+            "collect_media_garbage",
+            "--reconcile",
+            "--grace-period=0",
+            stdout=StringIO(),
+        )
+
+        self.assertEquals(
+            MediaBlob.objects.get(name=post.image.name).refcount,
+            1,
+        )
+        self.assertTrue(default_storage.exists(post.image.name))
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_HEADER="")
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, "blobs"), exist_ok=True)
+
+        with open(os.path.join(MEDIA_ROOT, "blobs", "photo.jpg"), "wb") as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.url = reverse("media", args=["blobs/photo.jpg"])
+
+    def test_file_is_served_with_long_lived_cache_headers(self):
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(b"".join(res.streaming_content), CONTENT)
+        self.assertEquals(res["Content-Type"], "image/jpeg")
+        self.assertEquals(res["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    def test_byte_range_is_served_partially(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+
+        self.assertEquals(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEquals(b"".join(res.streaming_content), CONTENT[10:20])
+        self.assertEquals(res["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+
+        self.assertEquals(b"".join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range_is_rejected(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=5000-")
+
+        self.assertEquals(
+            res.status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+        self.assertEquals(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_unmodified_file_is_not_sent_again(self):
+        res = self.client.get(self.url)
+
+        res = self.client.get(
+            self.url,
+            HTTP_IF_MODIFIED_SINCE=res["Last-Modified"],
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(MEDIA_SENDFILE_HEADER="X-Accel-Redirect")
+    def test_file_is_sent_by_front_server(self):
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res["X-Accel-Redirect"],
+            "/protected-media/blobs/photo.jpg",
+        )
+        self.assertEquals(res.content, b"")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    def test_files_outside_media_root_are_not_served(self):
+        res = self.client.get(reverse("media", args=["../etc/passwd"]))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,18 +1,50 @@
+import base64
+import json
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from social_media.models import Profile, Post
+from social_media.cache import (
+    get_response_key,
+    get_version,
+    object_scope,
+    set_cached_data,
+)
+from social_media.models import (
+    Profile,
+    Hashtag,
+    Post,
+    Comment,
+    TimelineEntry,
+)
 from social_media.serializers import (
+    CONTENT_PREVIEW_LENGTH,
+    LATEST_COMMENTS_SIZE,
     PostListSerializer,
     PostDetailSerializer,
 )
+from social_media.views import PostViewSet
 
 POST_LIST_URL = reverse("social_media:post-list")
+BULK_LIKE_URL = reverse("social_media:post-bulk-like-posts")
+FOR_YOU_URL = reverse("social_media:post-show-posts-for-you")
+SUBSCRIPTIONS_ONLY_URL = reverse(
+    "social_media:post-show-posts-from-subscriptions-only"
+)
 NUMBER_OF_POSTS = 5
+MISSING_ID = 10 ** 9
 PAGINATION_COUNT = 5
 
 
@@ -35,6 +67,10 @@ def like_unlike_url(post_id):
     return reverse("social_media:post-like-unlike-post", args=[post_id])
 
 
+def like_url(post_id):
+    return reverse("social_media:post-like-post", args=[post_id])
+
+
 class UnauthenticatedPostApiTests(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
@@ -78,6 +114,58 @@ class AuthenticatedPostApiTests(TestCase):
                     serializer.data[i][key],
                 )
 
+    def test_list_posts_cursor_pagination(self):
+        posts = create_posts(self.profile) + create_posts(self.profile)
+
+        res = self.client.get(POST_LIST_URL)
+        first_page = [post["id"] for post in res.data["results"]]
+
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+
+        Post.objects.create(
+            author=self.profile,
+            title="New Title",
+            content="New Content",
+        )
+        res = self.client.get(res.data["next"])
+        second_page = [post["id"] for post in res.data["results"]]
+
+        self.assertEquals(
+            first_page + second_page,
+            [post.id for post in reversed(posts)],
+        )
+        self.assertIsNone(res.data["next"])
+
+        res = self.client.get(res.data["previous"])
+
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            first_page,
+        )
+
+    def test_list_posts_invalid_cursor(self):
+        res = self.client.get(POST_LIST_URL, {"cursor": "invalid"})
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_posts_forged_cursor(self):
+        create_posts(self.profile)
+
+        for position in (["garbage", 1], [None, None], [{"a": 1}, 1]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"p": position}).encode()
+            ).decode()
+
+            for url in (POST_LIST_URL, SUBSCRIPTIONS_ONLY_URL):
+                with self.subTest(position=position, url=url):
+                    res = self.client.get(url, {"cursor": cursor})
+
+                    self.assertEquals(
+                        res.status_code,
+                        status.HTTP_404_NOT_FOUND,
+                    )
+
     def test_retrieve_post_detail(self):
         create_posts(self.profile)
 
@@ -91,6 +179,58 @@ class AuthenticatedPostApiTests(TestCase):
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertEquals(res.data, serializer.data)
 
+    def test_retrieve_post_invalid_id(self):
+        res = self.client.get(detail_url("abc"))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_post_detail_has_latest_comments_only(self):
+        post = create_posts(self.profile)[0]
+        comments = [
+            Comment.objects.create(
+                author=self.profile,
+                post=post,
+                content=f"Comment {i}",
+            )
+            for i in range(LATEST_COMMENTS_SIZE + 2)
+        ]
+
+        res = self.client.get(detail_url(post.id))
+
+        self.assertEquals(
+            [comment["id"] for comment in res.data["latest_comments"]],
+            [comment.id for comment in reversed(comments)][
+                :LATEST_COMMENTS_SIZE
+            ],
+        )
+        self.assertNotIn("likes", res.data)
+
+    def test_list_post_comments_is_paginated(self):
+        post = create_posts(self.profile)[0]
+        comments = [
+            Comment.objects.create(
+                author=self.profile,
+                post=post,
+                content=f"Comment {i}",
+            )
+            for i in range(15)
+        ]
+        url = reverse("social_media:post-show-comments", args=[post.id])
+        comment_ids = []
+
+        while url:
+            res = self.client.get(url)
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+            comment_ids += [comment["id"] for comment in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEquals(
+            comment_ids,
+            [comment.id for comment in reversed(comments)],
+        )
+
     def test_like_unlike_post(self):
         create_posts(self.profile)
 
@@ -102,11 +242,133 @@ class AuthenticatedPostApiTests(TestCase):
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertIn(self.profile, post.likes.all())
 
+        post.refresh_from_db()
+
+        self.assertEquals(post.likes_count, 1)
+
         res = self.client.post(url)
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertNotIn(self.profile, post.likes.all())
 
+        post.refresh_from_db()
+
+        self.assertEquals(post.likes_count, 0)
+
+    def test_like_post_is_idempotent(self):
+        post = create_posts(self.profile)[0]
+
+        for _ in range(2):
+            res = self.client.put(like_url(post.id))
+
+            self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        post.refresh_from_db()
+
+        self.assertEquals(post.likes_count, 1)
+
+        for _ in range(2):
+            res = self.client.delete(like_url(post.id))
+
+            self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        post.refresh_from_db()
+
+        self.assertEquals(post.likes_count, 0)
+        self.assertFalse(post.likes.exists())
+
+    def test_like_post_query_count_does_not_depend_on_likes(self):
+        post = create_posts(self.profile)[0]
+        users = [
+            get_user_model().objects.create_user(f"liker{i}@test.com")
+            for i in range(20)
+        ]
+        post.likes.add(
+            *[
+                Profile.objects.create(user=user, username=user.email)
+                for user in users
+            ]
+        )
+
+        # post, existence check, savepoint, insert, update, release
+        with self.assertNumQueries(6):
+            self.client.put(like_url(post.id))
+
+        # post, savepoint, delete, update, release
+        with self.assertNumQueries(5):
+            self.client.delete(like_url(post.id))
+
+    def test_bulk_like_posts(self):
+        posts = create_posts(self.profile)
+        posts[0].like(self.profile)
+        posts[1].like(self.profile)
+        payload = {
+            "like": [posts[0].id, posts[2].id, posts[3].id, MISSING_ID],
+            "unlike": [posts[1].id, posts[4].id],
+        }
+
+        res = self.client.post(BULK_LIKE_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [(item["id"], item["status"]) for item in res.data["results"]],
+            [
+                (posts[0].id, "already_liked"),
+                (posts[2].id, "liked"),
+                (posts[3].id, "liked"),
+                (MISSING_ID, "not_found"),
+                (posts[1].id, "unliked"),
+                (posts[4].id, "not_liked"),
+            ],
+        )
+        self.assertEquals(
+            {
+                post.id: post.likes_count
+                for post in Post.objects.filter(author=self.profile)
+            },
+            {
+                posts[0].id: 1,
+                posts[1].id: 0,
+                posts[2].id: 1,
+                posts[3].id: 1,
+                posts[4].id: 0,
+            },
+        )
+
+    def test_bulk_like_posts_query_count_does_not_depend_on_size(self):
+        posts = create_posts(self.profile) + create_posts(self.profile)
+        payload = {"like": [post.id for post in posts]}
+
+        # posts, savepoint, insert, counters update, release
+        with self.assertNumQueries(5):
+            self.client.post(BULK_LIKE_URL, payload, format="json")
+
+    def test_replayed_bulk_like_counts_only_inserted_likes(self):
+        posts = create_posts(self.profile)
+        Post.like_many(self.profile, [posts[0].id])
+
+        liked_ids = Post.like_many(self.profile, [posts[0].id, posts[1].id])
+
+        self.assertEquals(liked_ids, {posts[1].id})
+        self.assertEquals(Post.like_many(self.profile, [posts[1].id]), set())
+        self.assertEquals(
+            list(
+                Post.objects
+                .filter(pk__in=[posts[0].id, posts[1].id])
+                .order_by("id")
+                .values_list("likes_count", flat=True)
+            ),
+            [1, 1],
+        )
+
+    def test_bulk_like_posts_rejects_conflicting_ids(self):
+        post = create_posts(self.profile)[0]
+        payload = {"like": [post.id], "unlike": [post.id]}
+
+        res = self.client.post(BULK_LIKE_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_add_comment(self):
         create_posts(self.profile)
 
@@ -127,3 +389,596 @@ class AuthenticatedPostApiTests(TestCase):
             "{'detail': 'Your comment has been successfully added to the post.'}",
             str(res.data),
         )
+
+        post.refresh_from_db()
+
+        self.assertEquals(post.comments_count, 1)
+
+    def test_create_post_extracts_hashtags(self):
+        existing = Hashtag.objects.create(name="django")
+        manual = Hashtag.objects.create(name="manual")
+        payload = {
+            "title": "Hello #Django",
+            "content": "Tags #python, #django again, not#this, #42 or &#39;",
+            "hashtags": [manual.id],
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(POST_LIST_URL, payload)
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(id=res.data["id"])
+        self.assertEquals(
+            sorted(post.hashtags.values_list("name", flat=True)),
+            ["django", "manual", "python"],
+        )
+        self.assertEquals(Hashtag.objects.count(), 3)
+        self.assertIn(existing, post.hashtags.all())
+        self.assertEquals(
+            len(
+                [
+                    query for query in queries.captured_queries
+                    if query["sql"].startswith(
+                        'INSERT INTO "social_media_post_hashtags"'
+                    )
+                ]
+            ),
+            1,
+        )
+
+    def test_create_post_reuses_hashtags_of_any_case(self):
+        existing = Hashtag.objects.create(name="Django")
+
+        res = self.client.post(
+            POST_LIST_URL,
+            {"title": "Title", "content": "About #Django and #DJANGO"},
+        )
+
+        post = Post.objects.get(id=res.data["id"])
+        self.assertEquals(list(post.hashtags.all()), [existing])
+        self.assertEquals(Hashtag.objects.count(), 1)
+
+    def test_update_post_adds_new_hashtags(self):
+        post = create_posts(self.profile)[0]
+        kept = Hashtag.objects.create(name="kept")
+        post.hashtags.add(kept)
+
+        res = self.client.patch(
+            detail_url(post.id),
+            {"content": "Now about #testing"},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            sorted(post.hashtags.values_list("name", flat=True)),
+            ["kept", "testing"],
+        )
+
+
+    def test_update_post_removes_hashtags_edited_out(self):
+        manual = Hashtag.objects.create(name="manual")
+        res = self.client.post(
+            POST_LIST_URL,
+            {
+                "title": "Title",
+                "content": "About #foo and #bar",
+                "hashtags": [manual.id],
+            },
+        )
+
+        res = self.client.patch(
+            detail_url(res.data["id"]),
+            {"content": "Only about #bar"},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        post = Post.objects.get(id=res.data["id"])
+        self.assertEquals(
+            sorted(post.hashtags.values_list("name", flat=True)),
+            ["bar", "manual"],
+        )
+        self.assertEquals(Hashtag.objects.get(name="foo").posts_count, 0)
+
+class SubscriptionsOnlyFeedTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.author = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "author@test.com",
+                "test_pass",
+            ),
+            username="author",
+        )
+
+    def follow(self, profile):
+        self.client.post(
+            reverse("social_media:profile-follow-user", args=[profile.id])
+        )
+
+    def test_subscriptions_only_shows_posts_of_followings(self):
+        stranger = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "stranger@test.com",
+                "test_pass",
+            ),
+            username="stranger",
+        )
+        self.follow(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            posts = create_posts(self.author)
+            create_posts(stranger)
+
+        res = self.client.get(SUBSCRIPTIONS_ONLY_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [post.id for post in reversed(posts)][:PAGINATION_COUNT],
+        )
+
+    def test_subscriptions_only_next_page(self):
+        self.follow(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            posts = create_posts(self.author) + create_posts(self.author)
+
+        first_page = self.client.get(SUBSCRIPTIONS_ONLY_URL).data
+        res = self.client.get(first_page["next"])
+
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [post.id for post in reversed(posts)][
+                PAGINATION_COUNT:PAGINATION_COUNT * 2
+            ],
+        )
+
+    def test_new_post_is_fanned_out_after_commit(self):
+        self.follow(self.author)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = create_posts(self.author)[0]
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(profile=self.profile).exists()
+        )
+
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                profile=self.profile,
+                post=post,
+            ).exists()
+        )
+
+    @override_settings(TIMELINE_MAX_LENGTH=2)
+    def test_timeline_is_trimmed(self):
+        self.follow(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            posts = create_posts(self.author)
+
+        call_command("trim_timelines", stdout=StringIO())
+
+        self.assertEquals(
+            list(
+                TimelineEntry.objects
+                .filter(profile=self.profile)
+                .values_list("post_id", flat=True)
+            ),
+            [post.id for post in reversed(posts)][:2],
+        )
+
+    @override_settings(TIMELINE_FANOUT_FOLLOWERS_LIMIT=1)
+    def test_high_follower_author_posts_are_merged_on_read(self):
+        self.follow(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            posts = create_posts(self.author)
+
+        res = self.client.get(SUBSCRIPTIONS_ONLY_URL)
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(profile=self.profile).exists()
+        )
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [post.id for post in reversed(posts)][:PAGINATION_COUNT],
+        )
+
+    def test_skipped_posts_stay_merged_below_follower_limit(self):
+        self.follow(self.author)
+
+        with override_settings(TIMELINE_FANOUT_FOLLOWERS_LIMIT=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                skipped_posts = create_posts(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fanned_out_posts = create_posts(self.author)
+
+        res = self.client.get(SUBSCRIPTIONS_ONLY_URL)
+        first_page = [post["id"] for post in res.data["results"]]
+        res = self.client.get(res.data["next"])
+
+        self.assertEquals(
+            first_page + [post["id"] for post in res.data["results"]],
+            [
+                post.id
+                for post in reversed(skipped_posts + fanned_out_posts)
+            ],
+        )
+
+
+class ForYouFeedTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.following = self.create_profile("following")
+        self.second_degree = self.create_profile("second_degree")
+        self.stranger = self.create_profile("stranger")
+        self.profile.follow(self.following)
+        self.following.follow(self.second_degree)
+
+    @staticmethod
+    def create_profile(username):
+        return Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                f"{username}@test.com",
+                "test_pass",
+            ),
+            username=username,
+        )
+
+    @staticmethod
+    def create_post(author, age=timedelta(), hashtags=(), **counters):
+        post = Post.objects.create(
+            author=author,
+            title="Title",
+            content="Content",
+            **counters,
+        )
+        Post.objects.filter(pk=post.pk).update(
+            created_at=timezone.now() - age
+        )
+        post.refresh_from_db()
+        post.hashtags.add(*hashtags)
+        return post
+
+    def get_feed_ids(self):
+        res = self.client.get(FOR_YOU_URL, {"page_size": 100})
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return [post["id"] for post in res.data["results"]]
+
+    def test_feed_ranks_candidates_by_proximity(self):
+        trending = Hashtag.objects.create(name="trending")
+        stranger_post = self.create_post(self.stranger, hashtags=[trending])
+        second_degree_post = self.create_post(self.second_degree)
+        following_post = self.create_post(self.following)
+        self.create_post(self.stranger)
+        self.create_post(self.profile)
+        self.create_post(self.following, age=timedelta(days=8))
+
+        self.assertEquals(
+            self.get_feed_ids(),
+            [following_post.id, second_degree_post.id, stranger_post.id],
+        )
+
+    def test_feed_ranks_recent_and_engaging_posts_first(self):
+        old_post = self.create_post(self.following, age=timedelta(days=1))
+        new_post = self.create_post(self.following)
+        engaging_post = self.create_post(
+            self.following,
+            age=timedelta(hours=6),
+            likes_count=50,
+            comments_count=10,
+        )
+
+        self.assertEquals(
+            self.get_feed_ids(),
+            [engaging_post.id, new_post.id, old_post.id],
+        )
+
+    def test_feed_is_cached_per_user(self):
+        self.create_post(self.following)
+        self.get_feed_ids()
+        new_post = self.create_post(self.following)
+
+        self.assertNotIn(new_post.id, self.get_feed_ids())
+
+        cache.clear()
+
+        self.assertIn(new_post.id, self.get_feed_ids())
+
+    def test_feed_is_paginated(self):
+        posts = [self.create_post(self.following) for _ in range(7)]
+
+        res = self.client.get(FOR_YOU_URL)
+
+        self.assertEquals(res.data["count"], len(posts))
+        self.assertEquals(len(res.data["results"]), 5)
+        self.assertIsNotNone(res.data["next"])
+
+
+class PostApiQueryCountTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.posts = create_posts(self.profile)
+
+        for post in self.posts:
+            Comment.objects.create(
+                author=self.profile,
+                post=post,
+                content="Content",
+            )
+
+    def test_list_query_count(self):
+        # posts, hashtags
+        with self.assertNumQueries(2):
+            self.client.get(POST_LIST_URL)
+
+    def test_list_does_not_load_full_content(self):
+        Post.objects.filter(pk=self.posts[-1].pk).update(content="x" * 2000)
+
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertEquals(
+            len(res.data["results"][0]["content"]),
+            CONTENT_PREVIEW_LENGTH,
+        )
+
+    def test_retrieve_query_count(self):
+        # related objects, post with author, hashtags, latest comments
+        # with authors
+        with self.assertNumQueries(4):
+            self.client.get(detail_url(self.posts[0].id))
+
+    def test_add_comment_query_count(self):
+        # post, savepoint, insert, counter update, release
+        with self.assertNumQueries(5):
+            self.client.post(
+                reverse(
+                    "social_media:post-add-comment",
+                    args=[self.posts[0].id],
+                ),
+                {"content": "Content"},
+            )
+
+    def test_list_comments_query_count(self):
+        # post, comments with authors
+        with self.assertNumQueries(2):
+            self.client.get(
+                reverse(
+                    "social_media:post-show-comments",
+                    args=[self.posts[0].id],
+                )
+            )
+
+
+class CachedPostApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.post = create_posts(self.profile)[0]
+
+    def test_retrieve_is_served_from_cache(self):
+        res = self.client.get(detail_url(self.post.id))
+
+        # related objects
+        with self.assertNumQueries(1):
+            cached_res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(cached_res.status_code, status.HTTP_200_OK)
+        self.assertEquals(cached_res.data, res.data)
+
+    def test_like_invalidates_cached_post(self):
+        self.client.get(detail_url(self.post.id))
+        self.client.get(POST_LIST_URL)
+
+        self.client.put(like_url(self.post.id))
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.data["likes_count"], 1)
+
+        res = self.client.get(POST_LIST_URL)
+        post = next(
+            post for post in res.data["results"] if post["id"] == self.post.id
+        )
+
+        self.assertEquals(post["likes_count"], 1)
+
+    def test_comment_invalidates_cached_post(self):
+        self.client.get(detail_url(self.post.id))
+
+        self.client.post(
+            reverse("social_media:post-add-comment", args=[self.post.id]),
+            {"content": "Content"},
+        )
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.data["comments_count"], 1)
+        self.assertEquals(len(res.data["latest_comments"]), 1)
+
+    def test_update_invalidates_cached_post(self):
+        self.client.get(detail_url(self.post.id))
+
+        self.client.patch(detail_url(self.post.id), {"title": "New Title"})
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.data["title"], "New Title")
+
+    def test_author_update_invalidates_cached_post(self):
+        etag = self.client.get(detail_url(self.post.id))["ETag"]
+
+        self.client.patch(
+            reverse("social_media:profile-detail", args=[self.profile.id]),
+            {"username": "new_username"},
+        )
+
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["author"], "new_username")
+
+    def test_commenter_update_invalidates_cached_post(self):
+        commenter = Profile.objects.create(
+            user=get_user_model().objects.create_user(
+                "commenter@test.com",
+                "test_pass",
+            ),
+            username="commenter",
+        )
+        Comment.objects.create(
+            author=commenter,
+            post=self.post,
+            content="Content",
+        )
+        etag = self.client.get(detail_url(self.post.id))["ETag"]
+
+        commenter.username = "new_commenter"
+        commenter.save()
+
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.data["latest_comments"][0]["author"],
+            "new_commenter",
+        )
+
+    def test_hashtag_update_invalidates_cached_post(self):
+        hashtag = Hashtag.objects.create(name="old")
+        self.post.hashtags.add(hashtag)
+        self.client.get(detail_url(self.post.id))
+
+        hashtag.name = "new"
+        hashtag.save()
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.data["hashtags"], ["new"])
+
+    def test_related_updates_keep_post_version(self):
+        hashtag = Hashtag.objects.create(name="old")
+        self.post.hashtags.add(hashtag)
+        version = get_version(object_scope("post", self.post.id))
+
+        # The posts depend on the scopes of their author and hashtags
+        self.profile.bio = "New bio"
+        self.profile.save()
+        hashtag.name = "new"
+        hashtag.save()
+
+        self.assertEquals(
+            get_version(object_scope("post", self.post.id)),
+            version,
+        )
+
+    def test_read_before_commit_is_invalidated_on_commit(self):
+        old_data = self.client.get(detail_url(self.post.id)).data
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(detail_url(self.post.id), {"title": "New Title"})
+            # A concurrent read before the commit caches the old data
+            set_cached_data(
+                get_response_key(
+                    RequestFactory().get(detail_url(self.post.id)),
+                    *PostViewSet().get_object_scopes(self.post.id),
+                ),
+                old_data,
+            )
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.data["title"], "New Title")
+
+
+class ConditionalPostApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.post = create_posts(self.profile)[0]
+
+    def test_retrieve_not_modified_with_etag(self):
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertIn("ETag", res)
+        self.assertNotIn("Last-Modified", res)
+
+        res = self.client.get(
+            detail_url(self.post.id),
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_hashtag_rename_changes_etag(self):
+        hashtag = Hashtag.objects.create(name="old")
+        self.post.hashtags.add(hashtag)
+        etag = self.client.get(detail_url(self.post.id))["ETag"]
+
+        hashtag.name = "new"
+        hashtag.save()
+
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["hashtags"], ["new"])
+
+    def test_like_changes_etag(self):
+        etag = self.client.get(detail_url(self.post.id))["ETag"]
+
+        self.client.put(like_url(self.post.id))
+
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotEquals(res["ETag"], etag)
@@ -1,18 +1,24 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from social_media.models import Profile
+from social_media.models import Profile, Hashtag, Post, TimelineEntry
 from social_media.serializers import (
     ProfileListSerializer,
     ProfileDetailSerializer,
 )
 
 PROFILE_URL = reverse("social_media:profile-list")
+BULK_FOLLOW_URL = reverse("social_media:profile-bulk-follow-users")
+SUGGESTIONS_URL = reverse("social_media:profile-show-follow-suggestions")
 NUMBER_OF_PROFILES = 10
+MISSING_ID = 10 ** 9
 PAGINATION_COUNT = 10
 
 
@@ -94,6 +100,62 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertEquals(res.data, serializer.data)
 
+    def test_retrieve_profile_invalid_id(self):
+        res = self.client.get(detail_url("abc"))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_follow_invalidates_cached_profile(self):
+        users = create_users()
+        profile = create_profiles(users)[0]
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.client.get(detail_url(profile.id))
+
+        own_profile.follow(profile)
+
+        res = self.client.get(detail_url(profile.id))
+
+        self.assertEquals(res.data["followers_count"], 1)
+        self.assertEquals(res.data["followers_preview"], ["test_user"])
+
+    def test_retrieve_profile_not_modified(self):
+        users = create_users()
+        profile = create_profiles(users)[0]
+        etag = self.client.get(detail_url(profile.id))["ETag"]
+
+        res = self.client.get(detail_url(profile.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        own_profile.follow(profile)
+
+        res = self.client.get(detail_url(profile.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_follower_rename_changes_profile_etag(self):
+        profiles = create_profiles(create_users())
+        profiles[1].follow(profiles[0])
+        etag = self.client.get(detail_url(profiles[0].id))["ETag"]
+
+        profiles[1].username = "renamed_user"
+        profiles[1].save()
+
+        res = self.client.get(
+            detail_url(profiles[0].id),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["followers_preview"], ["renamed_user"])
+
     def test_follow_user(self):
         users = create_users()
         profile = create_profiles(users)[0]
@@ -112,6 +174,12 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertIn(profile, own_profile.followings.all())
 
+        profile.refresh_from_db()
+        own_profile.refresh_from_db()
+
+        self.assertEquals(profile.followers_count, 1)
+        self.assertEquals(own_profile.followings_count, 1)
+
     def test_unfollow_user(self):
         users = create_users()
         profile = create_profiles(users)[0]
@@ -136,3 +204,313 @@ class AuthenticatedProfileApiTests(TestCase):
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertNotIn(profile, own_profile.followings.all())
+
+        profile.refresh_from_db()
+        own_profile.refresh_from_db()
+
+        self.assertEquals(profile.followers_count, 0)
+        self.assertEquals(own_profile.followings_count, 0)
+
+    def test_bulk_follow_users(self):
+        users = create_users()
+        profiles = create_profiles(users)
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        own_profile.follow(profiles[0])
+        own_profile.follow(profiles[1])
+        payload = {
+            "follow": [profiles[0].id, profiles[2].id, MISSING_ID],
+            "unfollow": [profiles[1].id, profiles[3].id],
+        }
+
+        res = self.client.post(BULK_FOLLOW_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [(item["id"], item["status"]) for item in res.data["results"]],
+            [
+                (profiles[0].id, "already_followed"),
+                (profiles[2].id, "followed"),
+                (MISSING_ID, "not_found"),
+                (profiles[1].id, "unfollowed"),
+                (profiles[3].id, "not_followed"),
+            ],
+        )
+
+        own_profile.refresh_from_db()
+
+        self.assertEquals(own_profile.followings_count, 2)
+        self.assertEquals(
+            set(own_profile.followings.values_list("id", flat=True)),
+            {profiles[0].id, profiles[2].id},
+        )
+        self.assertEquals(
+            Profile.objects.get(pk=profiles[1].id).followers_count,
+            0,
+        )
+
+    def test_replayed_bulk_follow_counts_only_inserted_followings(self):
+        profiles = create_profiles(create_users())
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        own_profile.follow_many([profiles[0].id])
+
+        followed_ids = own_profile.follow_many(
+            [profiles[0].id, profiles[1].id]
+        )
+
+        self.assertEquals(followed_ids, {profiles[1].id})
+        self.assertEquals(own_profile.follow_many([profiles[1].id]), set())
+
+        own_profile.refresh_from_db()
+
+        self.assertEquals(own_profile.followings_count, 2)
+        self.assertEquals(
+            Profile.objects.get(pk=profiles[0].id).followers_count,
+            1,
+        )
+
+    def test_bulk_follow_users_query_count_does_not_depend_on_size(self):
+        profiles = create_profiles(create_users())
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+
+        for profile in profiles:
+            Post.objects.create(author=profile, title="Title", content="")
+
+        # profiles, savepoint, insert, 2 counters updates, release,
+        # timeline backfill, trim
+        for follow_ids in (profiles[:2], profiles[2:]):
+            with self.assertNumQueries(8):
+                self.client.post(
+                    BULK_FOLLOW_URL,
+                    {"follow": [profile.id for profile in follow_ids]},
+                    format="json",
+                )
+
+        self.assertEquals(
+            TimelineEntry.objects.filter(profile=own_profile).count(),
+            NUMBER_OF_PROFILES,
+        )
+
+    def test_bulk_follow_rejects_own_profile(self):
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+
+        res = self.client.post(
+            BULK_FOLLOW_URL,
+            {"follow": [own_profile.id]},
+            format="json",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_put_and_delete_following_are_idempotent(self):
+        users = create_users()
+        profile = create_profiles(users)[0]
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        url = reverse("social_media:profile-follow-user", args=[profile.id])
+
+        for _ in range(2):
+            res = self.client.put(url)
+
+            self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        profile.refresh_from_db()
+
+        self.assertEquals(profile.followers_count, 1)
+        self.assertIn(profile, own_profile.followings.all())
+
+        for _ in range(2):
+            res = self.client.delete(url)
+
+            self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        profile.refresh_from_db()
+
+        self.assertEquals(profile.followers_count, 0)
+        self.assertNotIn(profile, own_profile.followings.all())
+
+    def test_put_following_rejects_own_profile(self):
+        own_profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+
+        res = self.client.put(
+            reverse(
+                "social_media:profile-follow-user",
+                args=[own_profile.id],
+            )
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_profile_detail_has_counts_and_preview(self):
+        users = create_users()
+        profiles = create_profiles(users)
+        profile = profiles[0]
+
+        for follower in profiles[1:]:
+            follower.follow(profile)
+
+        res = self.client.get(detail_url(profile.id))
+
+        self.assertEquals(res.data["followers_count"], NUMBER_OF_PROFILES - 1)
+        self.assertEquals(res.data["followings_count"], 0)
+        self.assertEquals(
+            res.data["followers_preview"],
+            [follower.username for follower in profiles[1:6]],
+        )
+        self.assertNotIn("followers", res.data)
+
+    def test_list_followers_is_paginated(self):
+        users = create_users()
+        profiles = create_profiles(users)
+        profile = profiles[0]
+
+        for follower in profiles[1:]:
+            follower.follow(profile)
+
+        url = reverse("social_media:profile-show-followers", args=[profile.id])
+        url = f"{url}?page_size=4"
+        usernames = []
+
+        while url:
+            res = self.client.get(url)
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+            usernames += [
+                follower["username"] for follower in res.data["results"]
+            ]
+            url = res.data["next"]
+
+        self.assertEquals(
+            usernames,
+            [follower.username for follower in profiles[1:]],
+        )
+
+    def test_list_followings(self):
+        users = create_users()
+        profiles = create_profiles(users)
+        profile = profiles[0]
+        profile.follow(profiles[1])
+
+        res = self.client.get(
+            reverse("social_media:profile-show-followings", args=[profile.id])
+        )
+
+        self.assertEquals(
+            [following["username"] for following in res.data["results"]],
+            [profiles[1].username],
+        )
+
+
+class FollowSuggestionApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        users = create_users()
+        self.client.force_authenticate(users[0])
+        self.profiles = create_profiles(users)
+
+    def test_suggestions_rank_friends_of_friends(self):
+        me, a, b, c, d, e = self.profiles[:6]
+        me.follow_many([a.id, b.id])
+        a.follow_many([me.id, c.id, d.id])
+        b.follow_many([a.id, c.id, e.id])
+        hashtag = Hashtag.objects.create(name="shared")
+
+        for profile in (me, e):
+            post = Post.objects.create(
+                author=profile,
+                title="Title",
+                content="Content",
+            )
+            post.hashtags.add(hashtag)
+            post.like(me)
+            post.like(e)
+
+        call_command("compute_follow_suggestions", stdout=StringIO())
+        res = self.client.get(SUGGESTIONS_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [
+                (
+                    item["suggested"]["username"],
+                    item["mutual_followings_count"],
+                    item["shared_hashtags_count"],
+                )
+                for item in res.data["results"]
+            ],
+            [
+                (c.username, 2, 0),
+                (e.username, 1, 1),
+                (d.username, 1, 0),
+            ],
+        )
+
+        me.follow(c)
+
+        res = self.client.get(SUGGESTIONS_URL)
+
+        self.assertNotIn(
+            c.username,
+            [item["suggested"]["username"] for item in res.data["results"]],
+        )
+
+    def test_suggestions_query_count(self):
+        me, a, b = self.profiles[:3]
+        me.follow(a)
+        a.follow(b)
+        call_command("compute_follow_suggestions", stdout=StringIO())
+
+        with self.assertNumQueries(1):
+            res = self.client.get(SUGGESTIONS_URL)
+
+        self.assertEquals(len(res.data["results"]), 1)
+
+
+class ProfileApiQueryCountTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profiles = create_profiles(create_users())
+
+        for follower in self.profiles[1:]:
+            follower.follow(self.profiles[0])
+
+    def test_list_query_count(self):
+        with self.assertNumQueries(1):
+            self.client.get(PROFILE_URL)
+
+    def test_retrieve_query_count(self):
+        # profile, followings preview, followers preview
+        with self.assertNumQueries(3):
+            self.client.get(detail_url(self.profiles[0].id))
+
+    def test_list_followers_query_count(self):
+        # profile, followers
+        with self.assertNumQueries(2):
+            self.client.get(
+                reverse(
+                    "social_media:profile-show-followers",
+                    args=[self.profiles[0].id],
+                )
+            )
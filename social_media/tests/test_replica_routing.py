@@ -0,0 +1,118 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.async_views import _get_cached_data
+from social_media.models import Post
+from social_media.views import CacheResponseMixin
+from social_media_api.db.middleware import replica_routing_middleware
+
+REPLICA = "replica_1"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.factory = RequestFactory()
+        self.read_databases = []
+        self.middleware = replica_routing_middleware(self.get_response)
+
+    def get_response(self, request):
+        self.read_databases.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    def get_headers(self, user_id):
+        token = AccessToken.for_user(get_user_model()(id=user_id))
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_safe_requests_read_from_replica(self):
+        self.middleware(self.factory.get("/"))
+        self.middleware(self.factory.head("/", **self.get_headers(1)))
+
+        self.assertEquals(self.read_databases, [REPLICA, REPLICA])
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.middleware(self.factory.post("/"))
+
+        self.assertEquals(self.read_databases, [DEFAULT_DB_ALIAS])
+
+    def test_writes_go_to_primary(self):
+        post = Post()
+        post._state.db = REPLICA
+
+        self.assertEquals(
+            router.db_for_write(Post, instance=post),
+            DEFAULT_DB_ALIAS,
+        )
+
+    def test_user_reads_from_primary_after_writing(self):
+        self.middleware(self.factory.post("/", **self.get_headers(1)))
+        self.middleware(self.factory.get("/", **self.get_headers(1)))
+        self.middleware(self.factory.get("/", **self.get_headers(2)))
+
+        self.assertEquals(
+            self.read_databases,
+            [DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS, REPLICA],
+        )
+
+    @override_settings(DATABASE_PRIMARY_PIN_TIMEOUT=0)
+    def test_pin_expires(self):
+        self.middleware(self.factory.post("/", **self.get_headers(1)))
+        self.middleware(self.factory.get("/", **self.get_headers(1)))
+
+        self.assertEquals(self.read_databases, [DEFAULT_DB_ALIAS, REPLICA])
+
+    def test_async_requests_are_routed(self):
+        async def get_response(request):
+            return self.get_response(request)
+
+        middleware = replica_routing_middleware(get_response)
+
+        async_to_sync(middleware)(self.factory.post("/", **self.get_headers(1)))
+        async_to_sync(middleware)(self.factory.get("/", **self.get_headers(1)))
+        async_to_sync(middleware)(self.factory.get("/"))
+
+        self.assertEquals(
+            self.read_databases,
+            [DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS, REPLICA],
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_goes_to_primary(self):
+        self.middleware(self.factory.get("/"))
+
+        self.assertEquals(self.read_databases, [DEFAULT_DB_ALIAS])
+
+    def test_response_cache_is_filled_from_primary(self):
+        def view(request):
+            self.read_databases.append(router.db_for_read(Post))
+            return Response({"ok": True})
+
+        def get_response(request):
+            CacheResponseMixin()._get_cached_response("test", view, request)
+            self.read_databases.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        replica_routing_middleware(get_response)(self.factory.get("/"))
+
+        self.assertEquals(self.read_databases, [DEFAULT_DB_ALIAS, REPLICA])
+
+    def test_async_response_cache_is_filled_from_primary(self):
+        async def get_data():
+            self.read_databases.append(router.db_for_read(Post))
+            return {"ok": True}
+
+        async def get_response(request):
+            await _get_cached_data(request, "test", get_data)
+            return self.get_response(request)
+
+        middleware = replica_routing_middleware(get_response)
+        async_to_sync(middleware)(self.factory.get("/"))
+
+        self.assertEquals(self.read_databases, [DEFAULT_DB_ALIAS, REPLICA])
@@ -0,0 +1,158 @@
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.models import Profile, Post, Comment
+
+POST_SEARCH_URL = reverse("social_media:post-search-posts")
+COMMENT_SEARCH_URL = reverse("social_media:post-search-comments")
+PROFILE_SEARCH_URL = reverse("social_media:profile-search-profiles")
+
+
+def create_profile(username, **fields):
+    return Profile.objects.create(
+        user=get_user_model().objects.create_user(f"{username}@test.com"),
+        username=username,
+        **fields,
+    )
+
+
+class SearchApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+
+    def test_search_query_required(self):
+        res = self.client.get(POST_SEARCH_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_posts_ranks_title_matches_first(self):
+        content_match = Post.objects.create(
+            author=self.profile,
+            title="Weekend",
+            content="We went hiking in the mountains.",
+        )
+        title_match = Post.objects.create(
+            author=self.profile,
+            title="Mountains",
+            content="A long story about the weekend.",
+        )
+        Post.objects.create(
+            author=self.profile,
+            title="Unrelated",
+            content="Nothing to see here.",
+        )
+
+        res = self.client.get(POST_SEARCH_URL, {"search": "mountain"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [title_match.id, content_match.id],
+        )
+        self.assertIn(
+            "<b>Mountains</b>",
+            res.data["results"][0]["title_headline"],
+        )
+        self.assertIn(
+            "<b>mountains</b>",
+            res.data["results"][1]["content_headline"],
+        )
+
+    def test_search_vector_follows_post_updates(self):
+        post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+        post.content = "Django is great"
+        post.save()
+
+        res = self.client.get(POST_SEARCH_URL, {"search": "django"})
+
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [post.id],
+        )
+
+    def test_search_comments(self):
+        post = Post.objects.create(
+            author=self.profile,
+            title="Title",
+            content="Content",
+        )
+        comment = Comment.objects.create(
+            author=self.profile,
+            post=post,
+            content="Great photos of the sunset",
+        )
+        Comment.objects.create(
+            author=self.profile,
+            post=post,
+            content="Nice",
+        )
+
+        res = self.client.get(COMMENT_SEARCH_URL, {"search": "sunsets"})
+
+        self.assertEquals(
+            [comment["id"] for comment in res.data["results"]],
+            [comment.id],
+        )
+        self.assertIn("<b>sunset</b>", res.data["results"][0]["headline"])
+
+    def test_search_profiles_by_similar_names(self):
+        alexander = create_profile("alex_smith", first_name="Alexander")
+        create_profile("bob", first_name="Robert")
+
+        res = self.client.get(PROFILE_SEARCH_URL, {"search": "alexandr"})
+
+        self.assertEquals(
+            [profile["id"] for profile in res.data["results"]],
+            [alexander.id],
+        )
+
+
+class SearchQueryPlanTests(TestCase):
+    """The search queries must be able to use their indexes"""
+
+    def setUp(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_post_search_uses_index(self):
+        plan = Post.objects.filter(
+            search_vector=SearchQuery("django", config="english")
+        ).explain()
+
+        self.assertIn("post_search_vector_idx", plan)
+
+    def test_comment_search_uses_index(self):
+        plan = (
+            Comment.objects
+            .annotate(search=SearchVector("content", config="english"))
+            .filter(search=SearchQuery("django", config="english"))
+            .explain()
+        )
+
+        self.assertIn("comment_content_search_idx", plan)
+
+    def test_profile_search_uses_index(self):
+        plan = Profile.objects.filter(
+            username__trigram_word_similar="alex"
+        ).explain()
+
+        self.assertIn("profile_names_trgm_idx", plan)
@@ -0,0 +1,177 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, DateTimeField, Exists, OuterRef, Value
+
+from social_media.models import Profile, Post, TimelineEntry
+from social_media.paginations import get_keyset_filter
+
+# Fields of the timeline entries ordered like the posts, whose creation
+# time they copy
+ENTRY_FIELDS = {
+    "created_at": "created_at",
+    "-created_at": "-created_at",
+    "id": "post_id",
+    "-id": "-post_id",
+}
+
+
+def is_high_follower_author(author_id):
+    """Posts of the authors above the limit are not fanned out"""
+    followers_count = (
+        Profile.objects
+        .filter(pk=author_id)
+        .values_list("followers_count", flat=True)
+        .get()
+    )
+    return followers_count >= settings.TIMELINE_FANOUT_FOLLOWERS_LIMIT
+
+
+def _insert_entries(columns, rows):
+    """
+    Insert the rows selected by the queryset into the timelines in one
+    statement, skipping the existing entries; the columns are given in
+    the order of the selected values, model fields before annotations
+    """
+    sql, params = rows.query.sql_with_params()
+    quote_name = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote_name(TimelineEntry._meta.db_table)} "
+            f"({', '.join(map(quote_name, columns))}) "
+            f"{sql} ON CONFLICT DO NOTHING",
+            params,
+        )
+
+
+def trim_timeline(profile_id):
+    """Keep only the newest entries in the timeline of the profile"""
+    stale_entries = (
+        TimelineEntry.objects
+        .filter(profile_id=profile_id)
+        .order_by("-created_at", "-post_id")
+        .values("id")[settings.TIMELINE_MAX_LENGTH:]
+    )
+    TimelineEntry.objects.filter(id__in=stale_entries).delete()
+
+
+def trim_timelines():
+    """Trim the timelines grown over the limit, return their number"""
+    profile_ids = list(
+        TimelineEntry.objects
+        .values("profile_id")
+        .annotate(entries_count=Count("id"))
+        .filter(entries_count__gt=settings.TIMELINE_MAX_LENGTH)
+        .values_list("profile_id", flat=True)
+    )
+
+    for profile_id in profile_ids:
+        trim_timeline(profile_id)
+
+    return len(profile_ids)
+
+
+def fan_out_post(post):
+    """
+    Write a new post into the timelines of all the author's followers;
+    the timelines are trimmed periodically by the trim_timelines command
+    """
+    _insert_entries(
+        ("profile_id", "post_id", "created_at"),
+        Profile.followings.through.objects
+        .filter(to_profile_id=post.author_id)
+        .annotate(
+            post_id=Value(post.pk),
+            post_created_at=Value(post.created_at, DateTimeField()),
+        )
+        .values_list("from_profile_id", "post_id", "post_created_at")
+    )
+
+
+def add_author_to_timeline(profile, author):
+    """Copy the latest posts of a newly followed author into a timeline"""
+    add_authors_to_timeline(profile, [author.pk])
+
+
+def add_authors_to_timeline(profile, author_ids):
+    """Copy the latest posts of newly followed authors into a timeline"""
+    _insert_entries(
+        ("post_id", "created_at", "profile_id"),
+        Post.objects
+        .filter(author_id__in=author_ids, fanout_skipped=False)
+        .order_by("-created_at", "-id")
+        .annotate(profile_id=Value(profile.pk))
+        .values_list("id", "created_at", "profile_id")
+        [:settings.TIMELINE_MAX_LENGTH]
+    )
+    trim_timeline(profile.pk)
+
+
+def remove_author_from_timeline(profile, author):
+    """Drop the posts of an unfollowed author from a timeline"""
+    remove_authors_from_timeline(profile, [author.pk])
+
+
+def remove_authors_from_timeline(profile, author_ids):
+    """Drop the posts of several unfollowed authors from a timeline"""
+    TimelineEntry.objects.filter(
+        profile=profile,
+        post__author_id__in=author_ids,
+    ).delete()
+
+
+def get_merged_author_ids(profile):
+    """Followed authors with posts left out of the fan-out"""
+    return profile.followings.filter(
+        Exists(
+            Post.objects.filter(author=OuterRef("pk"), fanout_skipped=True)
+        )
+    ).values_list("id", flat=True)
+
+
+class Timeline:
+    """
+    Posts of the profile's timeline: its materialized entries merged with
+    the posts of the authors which were not fanned out. A page is selected
+    from the newest rows of every source, each read from its own index,
+    and only then are the posts of the page loaded.
+    """
+
+    model = Post
+
+    def __init__(self, profile, merged_author_ids, queryset=None):
+        self.profile = profile
+        self.merged_author_ids = merged_author_ids
+        self.queryset = Post.objects.all() if queryset is None else queryset
+
+    def get_page(self, ordering, position, limit):
+        entry_ordering = [ENTRY_FIELDS[field] for field in ordering]
+        entries = TimelineEntry.objects.filter(profile=self.profile)
+        sources = [
+            Post.objects.filter(author_id=author_id, fanout_skipped=True)
+            for author_id in self.merged_author_ids
+        ]
+
+        if position is not None:
+            entries = entries.filter(
+                get_keyset_filter(entry_ordering, position)
+            )
+            keyset_filter = get_keyset_filter(ordering, position)
+            sources = [source.filter(keyset_filter) for source in sources]
+
+        page_ids = entries.order_by(*entry_ordering).values("post_id")[:limit]
+
+        if sources:
+            page_ids = page_ids.union(
+                *(
+                    source.order_by(*ordering).values("id")[:limit]
+                    for source in sources
+                ),
+                all=True,
+            )
+
+        return (
+            self.queryset
+            .filter(id__in=page_ids)
+            .order_by(*ordering)[:limit]
+        )
@@ -0,0 +1,191 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from social_media.models import HashtagTrend, Post
+
+# Scores are kept relative to a fixed epoch ("forward decay"): a usage at
+# time t adds exp(decay * (t - EPOCH)) to the score of every window,
+# so an update never has to touch the other hashtags, and the order of
+# the stored scores is the order of the decayed ones at any moment.
+# The scores are stored as logarithms to stay in the float range.
+EPOCH = datetime(2023, 1, 1, tzinfo=dt_timezone.utc)
+
+# Usages older than this many half-lives add less than a millionth
+# of a fresh one and are left out of the recomputation
+RECOMPUTE_HALF_LIVES = 20
+
+RECOMPUTE_BATCH_SIZE = 1000
+
+
+def _get_decay(window):
+    return math.log(2) / settings.TRENDING_WINDOWS[window]
+
+
+def _get_log_weight(window, moment):
+    return _get_decay(window) * (moment - EPOCH).total_seconds()
+
+
+def get_score(window, log_score, now=None):
+    """Return the decayed usage count a stored log-score stands for now"""
+    now = now or timezone.now()
+    return math.exp(log_score - _get_log_weight(window, now))
+
+
+def record_usage(hashtag_ids, moment, removed=False):
+    """
+    Add the usage of the hashtags at the moment to their trending scores,
+    or take it back out of them if the hashtags were removed
+    """
+    hashtag_ids = set(hashtag_ids)
+
+    if not hashtag_ids:
+        return
+
+    for window in settings.TRENDING_WINDOWS:
+        weight = _get_log_weight(window, moment)
+        trends = HashtagTrend.objects.filter(
+            window=window,
+            hashtag_id__in=hashtag_ids,
+        )
+
+        if removed:
+            # log(exp(a) - exp(w)) = a + log(1 - exp(w - a)), floored
+            # so a rounding error cannot take the logarithm of zero
+            trends.update(
+                log_score=F("log_score") + Ln(
+                    Greatest(
+                        1 - Exp(Value(weight) - F("log_score")),
+                        Value(1e-12),
+                    )
+                )
+            )
+            continue
+
+        existing_ids = set(trends.values_list("hashtag_id", flat=True))
+
+        if existing_ids:
+            # log(exp(a) + exp(w)) = max(a, w) + log(1 + exp(-|a - w|))
+            trends.filter(hashtag_id__in=existing_ids).update(
+                log_score=Greatest(F("log_score"), Value(weight)) + Ln(
+                    1 + Exp(-Abs(F("log_score") - Value(weight)))
+                )
+            )
+
+        HashtagTrend.objects.bulk_create(
+            [
+                HashtagTrend(
+                    hashtag_id=hashtag_id,
+                    window=window,
+                    log_score=weight,
+                )
+                for hashtag_id in hashtag_ids - existing_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def _get_cache_key(window):
+    return f"trending:{window}"
+
+
+def get_trending_hashtags(window, limit):
+    """
+    Return the top hashtags of the window with their current scores.
+
+    The top of the ranking is read off the score index and cached
+    for a short while; the scores are decayed to the moment of every call.
+    """
+    key = _get_cache_key(window)
+    top = cache.get(key)
+
+    if top is None:
+        top = list(
+            HashtagTrend.objects
+            .filter(window=window)
+            .order_by("-log_score")
+            .values_list("hashtag_id", "hashtag__name", "log_score")
+            [:settings.TRENDING_TOP_K]
+        )
+        cache.set(key, top, timeout=settings.TRENDING_CACHE_TIMEOUT)
+
+    now = timezone.now()
+    return [
+        {
+            "id": hashtag_id,
+            "name": name,
+            "score": get_score(window, log_score, now),
+        }
+        for hashtag_id, name, log_score in top[:limit]
+    ]
+
+
+def _log_sum_exp(values):
+    peak = max(values)
+    total = math.fsum(math.exp(value - peak) for value in values)
+    return peak + math.log(total)
+
+
+def recompute_trending_hashtags(window):
+    """Rebuild the scores of the window from the tagged posts"""
+    since = timezone.now() - timedelta(
+        seconds=settings.TRENDING_WINDOWS[window] * RECOMPUTE_HALF_LIVES
+    )
+    usages = (
+        Post.hashtags.through.objects
+        .filter(post__created_at__gte=since)
+        .order_by("hashtag_id")
+        .values_list("hashtag_id", "post__created_at")
+    )
+
+    with transaction.atomic():
+        HashtagTrend.objects.filter(window=window).delete()
+
+        batch = []
+        hashtag_id = None
+        weights = []
+
+        for usage_hashtag_id, created_at in usages.iterator(
+            chunk_size=RECOMPUTE_BATCH_SIZE
+        ):
+            if usage_hashtag_id != hashtag_id and weights:
+                batch.append(
+                    HashtagTrend(
+                        hashtag_id=hashtag_id,
+                        window=window,
+                        log_score=_log_sum_exp(weights),
+                    )
+                )
+                weights = []
+
+                if len(batch) == RECOMPUTE_BATCH_SIZE:
+                    HashtagTrend.objects.bulk_create(batch)
+                    batch = []
+
+            hashtag_id = usage_hashtag_id
+            weights.append(_get_log_weight(window, created_at))
+
+        if weights:
+            batch.append(
+                HashtagTrend(
+                    hashtag_id=hashtag_id,
+                    window=window,
+                    log_score=_log_sum_exp(weights),
+                )
+            )
+
+        HashtagTrend.objects.bulk_create(batch)
+
+    return HashtagTrend.objects.filter(window=window).count()
+
+
+def clear_trending_cache():
+    cache.delete_many(
+        [_get_cache_key(window) for window in settings.TRENDING_WINDOWS]
+    )
@@ -0,0 +1,135 @@
+import mimetypes
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.exceptions import APIException, PermissionDenied
+from rest_framework.parsers import FileUploadParser
+
+UPLOAD_TOKEN_SALT = "social_media.uploads"
+
+# Room for the multipart boundaries and headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class ImageTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "The uploaded image is too large."
+    default_code = "image_too_large"
+
+
+def check_image_size(size):
+    if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise ImageTooLarge(
+            f"The uploaded image cannot be bigger than "
+            f"{settings.IMAGE_UPLOAD_MAX_SIZE} bytes."
+        )
+
+
+def check_image_pixels(uploaded_file):
+    """
+    Reject an image with too many pixels from its header alone,
+    before anything is decoded
+    """
+    try:
+        with Image.open(uploaded_file) as image:
+            width, height = image.size
+    except UnidentifiedImageError:
+        # Not an image, the image field validation rejects it
+        width, height = 0, 0
+    except Image.DecompressionBombError:
+        width, height = settings.IMAGE_UPLOAD_MAX_PIXELS + 1, 1
+    finally:
+        uploaded_file.seek(0)
+
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ImageTooLarge(
+            f"The uploaded image cannot have more than "
+            f"{settings.IMAGE_UPLOAD_MAX_PIXELS} pixels."
+        )
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every uploaded file to disk in chunks, never to memory,
+    and reject it as soon as it is bigger than IMAGE_UPLOAD_MAX_SIZE
+    or, once complete, has more pixels than IMAGE_UPLOAD_MAX_PIXELS
+    """
+
+    def handle_raw_input(
+        self,
+        input_data,
+        meta,
+        content_length,
+        boundary,
+        encoding=None,
+    ):
+        # A request that cannot fit is rejected before reading its body
+        check_image_size(content_length - MULTIPART_OVERHEAD)
+
+    def receive_data_chunk(self, raw_data, start):
+        check_image_size(start + len(raw_data))
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        check_image_pixels(uploaded_file)
+        return uploaded_file
+
+
+def bound_image_uploads(request):
+    """Stream the files of the image upload request through the handler"""
+    request.upload_handlers = [BoundedImageUploadHandler(request)]
+
+
+class ImageUploadParser(FileUploadParser):
+    """Raw image body, named after its content type if the client did not"""
+    media_type = "image/*"
+
+    def get_filename(self, stream, media_type, parser_context):
+        filename = super().get_filename(stream, media_type, parser_context)
+
+        if filename:
+            return filename
+
+        content_type = parser_context["request"].content_type
+        extension = mimetypes.guess_extension(content_type.split(";")[0])
+        return f"upload{extension or ''}"
+
+
+def create_upload_token(instance):
+    """
+    Sign the permission to replace the image of the instance once,
+    until the image changes or the token expires
+    """
+    return signing.dumps(
+        {
+            "model": instance._meta.model_name,
+            "pk": instance.pk,
+            "image": instance.image.name or "",
+        },
+        salt=UPLOAD_TOKEN_SALT,
+    )
+
+
+def load_upload_token(token):
+    """Return the instance a valid upload token was created for"""
+    try:
+        data = signing.loads(
+            token,
+            salt=UPLOAD_TOKEN_SALT,
+            max_age=settings.IMAGE_UPLOAD_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        raise PermissionDenied("The upload token is invalid or expired.")
+
+    model = apps.get_model("social_media", data["model"])
+    instance = model.objects.filter(pk=data["pk"]).first()
+
+    if instance is None or (instance.image.name or "") != data["image"]:
+        raise PermissionDenied("The upload token has already been used.")
+
+    return instance
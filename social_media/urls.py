@@ -1,9 +1,17 @@
+from django.urls import path
 from rest_framework import routers
 
+from social_media.async_views import (
+    list_posts,
+    retrieve_post,
+    list_subscription_posts,
+    retrieve_profile,
+)
 from social_media.views import (
     ProfileViewSet,
     HashtagViewSet,
     PostViewSet,
+    ImageUploadView,
 )
 
 router = routers.DefaultRouter()
@@ -11,6 +19,29 @@ router.register("profiles", ProfileViewSet)
 router.register("hashtags", HashtagViewSet)
 router.register("posts", PostViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "uploads/<str:token>/",
+        ImageUploadView.as_view(),
+        name="image-upload",
+    ),
+    # Async versions of the hot read paths, for an ASGI server
+    path("async/posts/", list_posts, name="async-post-list"),
+    path(
+        "async/posts/subscriptions-only/",
+        list_subscription_posts,
+        name="async-post-subscriptions-only",
+    ),
+    path(
+        "async/posts/<int:pk>/",
+        retrieve_post,
+        name="async-post-detail",
+    ),
+    path(
+        "async/profiles/<int:pk>/",
+        retrieve_profile,
+        name="async-profile-detail",
+    ),
+]
 
 app_name = "social_media"
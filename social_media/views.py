@@ -1,40 +1,153 @@
-from django.db.models import Count
+import hashlib
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, OuterRef, Q
+from django.db.models.functions import Greatest, Left
+from django.http import Http404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import PolymorphicProxySerializer, extend_schema
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from social_media.cache import (
+    object_scope,
+    list_scope,
+    get_response_key,
+    get_cached_data,
+    set_cached_data,
+    get_versions,
+)
+from social_media.feeds import get_ranked_post_ids
+from social_media.images import enqueue_image_processing
 from social_media.models import (
+    SEARCH_CONFIG,
     Profile,
+    FollowSuggestion,
     Hashtag,
     Post,
+    Comment,
 )
 from social_media.paginations import (
     ProfilePagination,
     HashtagPagination,
     PostPagination,
+    CommentPagination,
+    FeedPagination,
+    SearchPagination,
+    TimelinePagination,
 )
 from social_media.permissions import (
     IsProfileOwnerOrReadOnly,
     IsPostOwnerOrReadOnly,
 )
 from social_media.serializers import (
+    CONTENT_PREVIEW_LENGTH,
+    LATEST_COMMENTS_SIZE,
+    SearchQuerySerializer,
     ProfileSerializer,
     ProfileListSerializer,
     ProfileDetailSerializer,
     ProfileImageSerializer,
+    ProfileBulkFollowSerializer,
+    ProfileSearchSerializer,
+    FollowSuggestionSerializer,
     HashtagSerializer,
+    HashtagBulkSerializer,
+    HashtagAutocompleteQuerySerializer,
+    HashtagAutocompleteSerializer,
+    HashtagTrendingQuerySerializer,
+    HashtagTrendingSerializer,
     PostSerializer,
     PostListSerializer,
     PostDetailSerializer,
     PostImageSerializer,
+    PostBulkLikeSerializer,
+    PostSearchSerializer,
+    CommentDetailSerializer,
+    CommentSearchSerializer,
     CommentAddSerializer,
 )
+from social_media.timelines import (
+    add_author_to_timeline,
+    add_authors_to_timeline,
+    remove_author_from_timeline,
+    remove_authors_from_timeline,
+    get_merged_author_ids,
+    Timeline,
+)
+from social_media.trending import get_trending_hashtags
+from social_media.uploads import (
+    ImageUploadParser,
+    bound_image_uploads,
+    create_upload_token,
+    load_upload_token,
+)
+from social_media_api.db.routers import read_from_primary
+
+
+def get_bulk_results(action, ids, done_ids, done, skipped, existing_ids=None):
+    """Build the per-item results of a bulk action in the requested order"""
+    results = []
+
+    for target_id in dict.fromkeys(ids):
+        if target_id in done_ids:
+            item_status = done
+        elif existing_ids is not None and target_id not in existing_ids:
+            item_status = "not_found"
+        else:
+            item_status = skipped
+
+        results.append(
+            {"id": target_id, "action": action, "status": item_status}
+        )
+
+    return results
+
+
+def get_search_text(request):
+    serializer = SearchQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data["search"]
+
+
+def save_uploaded_image(serializer):
+    # The variants are generated off the request by the image worker
+    with transaction.atomic():
+        instance = serializer.save(image_variants={})
+
+        if instance.image:
+            enqueue_image_processing(instance)
+
+    return instance
 
 
 class UploadImageMixin:
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+
+        # Only the image uploads are bounded, not every multipart request
+        if self.action == "upload_image":
+            bound_image_uploads(request._request)
+
+        return request
+
     @action(
         methods=["POST"],
         detail=True,
@@ -46,22 +159,185 @@ class UploadImageMixin:
         serializer = self.get_serializer(instance, data=request.data)
 
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        save_uploaded_image(serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="upload-image-token",
+    )
+    def upload_image_token(self, request, pk=None):
+        """Endpoint for getting a one-time URL to PUT the image to"""
+        token = create_upload_token(self.get_object())
 
-@extend_schema(tags=["Profiles"])
-class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
-    queryset = (
-        Profile.objects
-        .select_related("user")
-        .prefetch_related(
-            "followings",
-            "followers",
+        return Response(
+            {
+                "upload_url": request.build_absolute_uri(
+                    reverse("social_media:image-upload", args=[token])
+                ),
+                "method": "PUT",
+                "expires_in": settings.IMAGE_UPLOAD_TOKEN_MAX_AGE,
+                "max_size": settings.IMAGE_UPLOAD_MAX_SIZE,
+                "max_pixels": settings.IMAGE_UPLOAD_MAX_PIXELS,
+            },
+            status=status.HTTP_200_OK,
         )
-        .annotate(followers_count=Count("followers"))
-        .order_by("username")
+
+
+class ImageUploadView(APIView):
+    """
+    Upload of a raw image body authorized by a signed token instead of
+    the user; the token is checked before the body is read, and nginx
+    sends the route to the upload workers apart from the API ones
+    """
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    parser_classes = (ImageUploadParser,)
+    serializer_classes = {
+        "profile": ProfileImageSerializer,
+        "post": PostImageSerializer,
+    }
+
+    def initialize_request(self, request, *args, **kwargs):
+        bound_image_uploads(request)
+        return super().initialize_request(request, *args, **kwargs)
+
+    @extend_schema(
+        request={"image/*": bytes},
+        responses=PolymorphicProxySerializer(
+            component_name="ImageUpload",
+            serializers=list(serializer_classes.values()),
+            resource_type_field_name=None,
+        ),
     )
+    def put(self, request, token):
+        instance = load_upload_token(token)
+        image = request.data.get("file")
+        serializer = self.serializer_classes[instance._meta.model_name](
+            instance,
+            data={"image": image},
+            context={"request": request},
+        )
+
+        try:
+            serializer.is_valid(raise_exception=True)
+            save_uploaded_image(serializer)
+        finally:
+            # Django only closes the files of the multipart requests
+            if image is not None:
+                image.close()
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class CacheResponseMixin:
+    """Serve the list and retrieve actions from the versioned response cache"""
+
+    cache_scope = None
+
+    def list(self, request, *args, **kwargs):
+        return self._get_cached_response(
+            [list_scope(self.cache_scope)],
+            super().list,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self._get_cached_response(
+            self.get_object_scopes(lookup),
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def get_object_scopes(self, lookup):
+        """Scopes of the object and of the related objects it shows"""
+        if getattr(self, "_object_scopes", None) is None:
+            # Like get_object_or_404, for a lookup not fitting the field
+            try:
+                related_scopes = self.get_related_scopes(lookup)
+            except (TypeError, ValueError, ValidationError):
+                raise Http404
+
+            self._object_scopes = [
+                object_scope(self.cache_scope, lookup),
+                *related_scopes,
+            ]
+
+        return self._object_scopes
+
+    def get_related_scopes(self, lookup):
+        """
+        Scopes of the related objects shown by the detail: a change of
+        theirs then costs one version bump instead of one per object
+        """
+        return []
+
+    def _get_cached_response(self, scopes, view, request, *args, **kwargs):
+        key = get_response_key(request, *scopes)
+        data = get_cached_data(key)
+
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        # A lagging replica would cache its old data under the version
+        # bumped by the write, for every user
+        with read_from_primary():
+            response = view(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_data(key, response.data)
+
+        return response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer the retrieve action with 304 Not Modified when the client's
+    ETag matches the versions of the object's cache scopes
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        # No Last-Modified: the timestamps of the object miss the changes
+        # of the related objects it shows, which bump the versions
+        scopes = self.get_object_scopes(lookup)
+        versions = ":".join(map(str, get_versions(scopes)))
+        etag = quote_etag(
+            hashlib.md5(
+                f"{scopes}:{versions}".encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+        )
+
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = etag
+
+        return response
+
+
+@extend_schema(tags=["Profiles"])
+class ProfileViewSet(
+    ConditionalRetrieveMixin,
+    CacheResponseMixin,
+    UploadImageMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Profile.objects.order_by("username")
+    cache_scope = "profile"
     serializer_class = ProfileSerializer
     permission_classes = (IsAuthenticated, IsProfileOwnerOrReadOnly)
     pagination_class = ProfilePagination
@@ -72,8 +348,33 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
         "last_name",
     )
 
-    def get_serializer_class(self):
+    list_fields = (*ProfileListSerializer.Meta.fields, "image_variants")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
         if self.action == "list":
+            return queryset.only(*self.list_fields)
+
+        if self.action in (
+            "follow_user",
+            "unfollow_user",
+            "put_following",
+            "delete_following",
+            "show_followers",
+            "show_followings",
+        ):
+            return queryset.only("id", "username")
+
+        return queryset
+
+    def get_related_scopes(self, lookup):
+        # The previews show the first usernames of the follows in order,
+        # which a rename of any of them can change, shown or not
+        return [list_scope("username")]
+
+    def get_serializer_class(self):
+        if self.action in ("list", "show_followers", "show_followings"):
             return ProfileListSerializer
 
         if self.action == "retrieve":
@@ -82,6 +383,15 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
         if self.action == "upload_image":
             return ProfileImageSerializer
 
+        if self.action == "bulk_follow_users":
+            return ProfileBulkFollowSerializer
+
+        if self.action == "search_profiles":
+            return ProfileSearchSerializer
+
+        if self.action == "show_follow_suggestions":
+            return FollowSuggestionSerializer
+
         return ProfileSerializer
 
     @action(
@@ -95,11 +405,8 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
         profile = self.get_object()
         own_profile = self.request.user.profile
 
-        if (
-            profile != own_profile
-            and own_profile not in profile.followers.all()
-        ):
-            profile.followers.add(own_profile)
+        if profile != own_profile and own_profile.follow(profile):
+            add_author_to_timeline(own_profile, profile)
             return Response(
                 {"detail": f"You have successfully followed {profile}."},
                 status=status.HTTP_200_OK,
@@ -110,6 +417,34 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @follow_user.mapping.put
+    def put_following(self, request, pk=None):
+        """Idempotent endpoint for subscribing to a user"""
+        profile = self.get_object()
+        own_profile = self.request.user.profile
+
+        if profile == own_profile:
+            return Response(
+                {"detail": "You cannot follow yourself!"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if own_profile.follow(profile):
+            add_author_to_timeline(own_profile, profile)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @follow_user.mapping.delete
+    def delete_following(self, request, pk=None):
+        """Idempotent endpoint for unsubscribing from a user"""
+        profile = self.get_object()
+        own_profile = self.request.user.profile
+
+        if own_profile.unfollow(profile):
+            remove_author_from_timeline(own_profile, profile)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @action(
         methods=["POST"],
         detail=True,
@@ -121,11 +456,8 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
         profile = self.get_object()
         own_profile = self.request.user.profile
 
-        if (
-            profile != own_profile
-            and own_profile in profile.followers.all()
-        ):
-            profile.followers.remove(own_profile)
+        if profile != own_profile and own_profile.unfollow(profile):
+            remove_author_from_timeline(own_profile, profile)
             return Response(
                 {"detail": f"You have successfully unfollowed {profile}."},
                 status=status.HTTP_200_OK,
@@ -136,32 +468,260 @@ class ProfileViewSet(UploadImageMixin, viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    def _paginate_profiles(self, profiles):
+        page = self.paginate_queryset(profiles)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="followers",
+        permission_classes=[IsAuthenticated],
+    )
+    def show_followers(self, request, pk=None):
+        """Endpoint for showing a list of the profile's followers"""
+        return self._paginate_profiles(
+            self.get_object().followers.only(*self.list_fields)
+        )
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="followings",
+        permission_classes=[IsAuthenticated],
+    )
+    def show_followings(self, request, pk=None):
+        """Endpoint for showing a list of the profile's followings"""
+        return self._paginate_profiles(
+            self.get_object().followings.only(*self.list_fields)
+        )
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-follow",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_follow_users(self, request):
+        """Endpoint for subscribing to and unsubscribing from users in bulk"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        own_profile = self.request.user.profile
+        follow_ids = serializer.validated_data["follow"]
+        unfollow_ids = serializer.validated_data["unfollow"]
+        followed_ids = unfollowed_ids = existing_ids = set()
+
+        if follow_ids:
+            existing_ids = set(
+                Profile.objects
+                .filter(id__in=follow_ids)
+                .values_list("id", flat=True)
+            )
+            followed_ids = own_profile.follow_many(existing_ids)
+
+            if followed_ids:
+                add_authors_to_timeline(own_profile, followed_ids)
+
+        if unfollow_ids:
+            unfollowed_ids = own_profile.unfollow_many(unfollow_ids)
+            remove_authors_from_timeline(own_profile, unfollowed_ids)
+
+        return Response(
+            {
+                "results": (
+                    get_bulk_results(
+                        "follow",
+                        follow_ids,
+                        followed_ids,
+                        "followed",
+                        "already_followed",
+                        existing_ids,
+                    )
+                    + get_bulk_results(
+                        "unfollow",
+                        unfollow_ids,
+                        unfollowed_ids,
+                        "unfollowed",
+                        "not_followed",
+                    )
+                )
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search",
+        permission_classes=[IsAuthenticated],
+        pagination_class=SearchPagination,
+    )
+    def search_profiles(self, request):
+        """Endpoint for searching profiles by their names"""
+        text = get_search_text(request)
+        profiles = (
+            Profile.objects
+            .only(*self.list_fields)
+            .filter(
+                Q(username__trigram_word_similar=text)
+                | Q(first_name__trigram_word_similar=text)
+                | Q(last_name__trigram_word_similar=text)
+            )
+            .annotate(
+                rank=Greatest(
+                    TrigramWordSimilarity(text, "username"),
+                    TrigramWordSimilarity(text, "first_name"),
+                    TrigramWordSimilarity(text, "last_name"),
+                )
+            )
+            .order_by("-rank", "username")
+        )
+        return self._paginate_profiles(profiles)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="suggestions",
+        permission_classes=[IsAuthenticated],
+    )
+    def show_follow_suggestions(self, request):
+        """Endpoint for showing the profiles worth following"""
+        own_profile = self.request.user.profile
+        suggestions = (
+            FollowSuggestion.objects
+            .filter(profile=own_profile)
+            .exclude(
+                suggested__in=Profile.followings.through.objects.filter(
+                    from_profile=own_profile
+                ).values("to_profile_id")
+            )
+            .select_related("suggested")
+            .only(
+                "score",
+                "mutual_followings_count",
+                "shared_hashtags_count",
+                "suggested_id",
+                *[f"suggested__{field}" for field in self.list_fields],
+            )
+            .order_by("-score", "suggested_id")
+        )
+        serializer = self.get_serializer(suggestions, many=True)
+
+        return Response(
+            {"results": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
 
 @extend_schema(tags=["Hashtags"])
-class HashtagViewSet(viewsets.ModelViewSet):
+class HashtagViewSet(CacheResponseMixin, viewsets.ModelViewSet):
     queryset = Hashtag.objects.all()
+    cache_scope = "hashtag"
     serializer_class = HashtagSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = HashtagPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ("name",)
 
+    def get_serializer_class(self):
+        if self.action == "bulk_create_hashtags":
+            return HashtagBulkSerializer
+
+        if self.action == "autocomplete_hashtags":
+            return HashtagAutocompleteSerializer
+
+        if self.action == "show_trending_hashtags":
+            return HashtagTrendingSerializer
+
+        return HashtagSerializer
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+    )
+    def bulk_create_hashtags(self, request):
+        """Endpoint for getting or creating hashtags in bulk"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        names = list(dict.fromkeys(serializer.validated_data["names"]))
+        hashtags, created_names = Hashtag.get_or_create_many(names)
+
+        return Response(
+            {
+                "results": [
+                    {
+                        "id": hashtags[name].id,
+                        "name": name,
+                        "created": name in created_names,
+                    }
+                    for name in names
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(parameters=[HashtagAutocompleteQuerySerializer])
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="autocomplete",
+    )
+    def autocomplete_hashtags(self, request):
+        """Endpoint for suggesting the most used hashtags with a prefix"""
+        query = HashtagAutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        hashtags = (
+            Hashtag.objects
+            .filter(name__istartswith=query.validated_data["prefix"])
+            .order_by("-posts_count", "name")
+            [:query.validated_data["limit"]]
+        )
+        serializer = self.get_serializer(hashtags, many=True)
+
+        return Response(
+            {"results": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(parameters=[HashtagTrendingQuerySerializer])
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="trending",
+    )
+    def show_trending_hashtags(self, request):
+        """Endpoint for listing the trending hashtags of a time window"""
+        query = HashtagTrendingQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        hashtags = get_trending_hashtags(**query.validated_data)
+        serializer = self.get_serializer(hashtags, many=True)
+
+        return Response(
+            {
+                "window": query.validated_data["window"],
+                "results": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 @extend_schema(tags=["Posts"])
-class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
+class PostViewSet(
+    ConditionalRetrieveMixin,
+    CacheResponseMixin,
+    UploadImageMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
         Post.objects
         .select_related("author")
-        .prefetch_related(
-            "hashtags",
-            "comments__author",
-        )
-        .annotate(
-            likes_count=Count("likes", distinct=True),
-            comments_count=Count("comments", distinct=True),
-        )
+        .prefetch_related("hashtags")
+        .defer("search_vector")
         .order_by("-created_at")
     )
+    cache_scope = "post"
     serializer_class = PostSerializer
     permission_classes = (IsAuthenticated, IsPostOwnerOrReadOnly)
     pagination_class = PostPagination
@@ -173,11 +733,99 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         "hashtags",
     )
 
+    list_fields = (
+        "id",
+        "author",
+        "author__username",
+        "title",
+        "created_at",
+        "likes_count",
+        "comments_count",
+        "image",
+        "image_variants",
+    )
+
+    def get_queryset(self):
+        if self.action in (
+            "list",
+            "show_favorite_posts",
+            "show_posts_from_subscriptions_only",
+            "show_posts_for_you",
+            "search_posts",
+        ):
+            return (
+                super().get_queryset()
+                .only(*self.list_fields)
+                .annotate(
+                    content_preview=Left("content", CONTENT_PREVIEW_LENGTH)
+                )
+            )
+
+        if self.action == "retrieve":
+            return super().get_queryset()
+
+        if self.action == "upload_image":
+            return Post.objects.only(
+                "id",
+                "author",
+                "title",
+                "image",
+                "updated_at",
+            )
+
+        if self.action in (
+            "like_unlike_post",
+            "like_post",
+            "unlike_post",
+            "add_comment",
+            "show_comments",
+        ):
+            return Post.objects.only("id")
+
+        return Post.objects.defer("search_vector")
+
+    def get_related_scopes(self, lookup):
+        # The detail shows the names of the author, the hashtags and the
+        # latest commenters; their ids are part of the key as well
+        related = (
+            Post.objects
+            .filter(pk=lookup)
+            .values_list(
+                "author_id",
+                ArraySubquery(
+                    Post.hashtags.through.objects
+                    .filter(post_id=OuterRef("pk"))
+                    .order_by("hashtag_id")
+                    .values("hashtag_id")
+                ),
+                ArraySubquery(
+                    Comment.objects
+                    .filter(post_id=OuterRef("pk"))
+                    .values("author_id")[:LATEST_COMMENTS_SIZE]
+                ),
+            )
+            .first()
+        )
+
+        if related is None:
+            return []
+
+        author_id, hashtag_ids, commenter_ids = related
+        scopes = [
+            *[
+                object_scope("author", pk)
+                for pk in [author_id, *commenter_ids]
+            ],
+            *[object_scope("hashtag", pk) for pk in hashtag_ids],
+        ]
+        return list(dict.fromkeys(scopes))
+
     def get_serializer_class(self):
         if self.action in (
             "list",
             "show_favorite_posts",
             "show_posts_from_subscriptions_only",
+            "show_posts_for_you",
         ):
             return PostListSerializer
 
@@ -190,6 +838,18 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         if self.action == "add_comment":
             return CommentAddSerializer
 
+        if self.action == "show_comments":
+            return CommentDetailSerializer
+
+        if self.action == "bulk_like_posts":
+            return PostBulkLikeSerializer
+
+        if self.action == "search_posts":
+            return PostSearchSerializer
+
+        if self.action == "search_comments":
+            return CommentSearchSerializer
+
         return PostSerializer
 
     @action(
@@ -203,16 +863,81 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         post = self.get_object()
         own_profile = self.request.user.profile
 
-        if own_profile not in post.likes.all():
-            post.likes.add(own_profile)
+        if post.unlike(own_profile):
             return Response(
-                {"detail": "You have successfully liked the post."},
+                {"detail": "Your like was successfully removed."},
                 status=status.HTTP_200_OK,
             )
 
-        post.likes.remove(own_profile)
+        post.like(own_profile)
+        return Response(
+            {"detail": "You have successfully liked the post."},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        methods=["PUT"],
+        detail=True,
+        url_path="like",
+        permission_classes=[IsAuthenticated],
+    )
+    def like_post(self, request, pk=None):
+        """Idempotent endpoint for liking the post"""
+        self.get_object().like(self.request.user.profile)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @like_post.mapping.delete
+    def unlike_post(self, request, pk=None):
+        """Idempotent endpoint for removing the like from the post"""
+        self.get_object().unlike(self.request.user.profile)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-like",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_like_posts(self, request):
+        """Endpoint for liking and unliking posts in bulk"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        own_profile = self.request.user.profile
+        like_ids = serializer.validated_data["like"]
+        unlike_ids = serializer.validated_data["unlike"]
+        liked_ids = unliked_ids = existing_ids = set()
+
+        if like_ids:
+            existing_ids = set(
+                Post.objects
+                .filter(id__in=like_ids)
+                .values_list("id", flat=True)
+            )
+            liked_ids = Post.like_many(own_profile, existing_ids)
+
+        if unlike_ids:
+            unliked_ids = Post.unlike_many(own_profile, unlike_ids)
+
         return Response(
-            {"detail": "Your like was successfully removed."},
+            {
+                "results": (
+                    get_bulk_results(
+                        "like",
+                        like_ids,
+                        liked_ids,
+                        "liked",
+                        "already_liked",
+                        existing_ids,
+                    )
+                    + get_bulk_results(
+                        "unlike",
+                        unlike_ids,
+                        unliked_ids,
+                        "unliked",
+                        "not_liked",
+                    )
+                )
+            },
             status=status.HTTP_200_OK,
         )
 
@@ -225,9 +950,10 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
     def show_favorite_posts(self, request):
         """Endpoint for showing a list of the favorite posts"""
         own_profile = self.request.user.profile
-        posts = Post.objects.filter(likes=own_profile)
-        serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        posts = self.get_queryset().filter(likes=own_profile)
+        page = self.paginate_queryset(posts)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         methods=["POST"],
@@ -242,11 +968,18 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         serializer = CommentAddSerializer(data=request.data)
 
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            author=own_profile,
-            post=post,
-            content=serializer.validated_data["content"],
-        )
+
+        with transaction.atomic():
+            serializer.save(
+                author=own_profile,
+                post=post,
+                content=serializer.validated_data["content"],
+            )
+            Post.objects.filter(pk=post.pk).update(
+                comments_count=F("comments_count") + 1,
+                updated_at=timezone.now(),
+            )
+
         return Response(
             {
                 "detail": "Your comment has been successfully "
@@ -255,15 +988,126 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="comments",
+        permission_classes=[IsAuthenticated],
+        pagination_class=CommentPagination,
+    )
+    def show_comments(self, request, pk=None):
+        """Endpoint for showing a list of the post's comments"""
+        comments = self.get_object().comments.select_related("author")
+        page = self.paginate_queryset(comments)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def _paginate(self, queryset):
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search",
+        permission_classes=[IsAuthenticated],
+        pagination_class=SearchPagination,
+    )
+    def search_posts(self, request):
+        """Endpoint for the full-text search over post titles and contents"""
+        query = SearchQuery(
+            get_search_text(request),
+            config=SEARCH_CONFIG,
+            search_type="websearch",
+        )
+        posts = (
+            self.get_queryset()
+            .filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                title_headline=SearchHeadline(
+                    "title",
+                    query,
+                    config=SEARCH_CONFIG,
+                    highlight_all=True,
+                ),
+                content_headline=SearchHeadline(
+                    "content",
+                    query,
+                    config=SEARCH_CONFIG,
+                    max_fragments=3,
+                ),
+            )
+            .order_by("-rank", "-created_at", "-id")
+        )
+        return self._paginate(posts)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="search-comments",
+        permission_classes=[IsAuthenticated],
+        pagination_class=SearchPagination,
+    )
+    def search_comments(self, request):
+        """Endpoint for the full-text search over comments"""
+        query = SearchQuery(
+            get_search_text(request),
+            config=SEARCH_CONFIG,
+            search_type="websearch",
+        )
+        vector = SearchVector("content", config=SEARCH_CONFIG)
+        comments = (
+            Comment.objects
+            .select_related("author")
+            .annotate(search=vector)
+            .filter(search=query)
+            .annotate(
+                rank=SearchRank(vector, query),
+                headline=SearchHeadline(
+                    "content",
+                    query,
+                    config=SEARCH_CONFIG,
+                ),
+            )
+            .order_by("-rank", "-created_at", "-id")
+        )
+        return self._paginate(comments)
+
     @action(
         methods=["GET"],
         detail=False,
         url_path="subscriptions-only",
         permission_classes=[IsAuthenticated],
+        pagination_class=TimelinePagination,
     )
     def show_posts_from_subscriptions_only(self, request):
         """Endpoint for showing a list of the posts from subscriptions only"""
         own_profile = self.request.user.profile
-        posts = Post.objects.filter(author__in=own_profile.followings.all())
-        serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        timeline = Timeline(
+            own_profile,
+            list(get_merged_author_ids(own_profile)),
+            self.get_queryset(),
+        )
+        page = self.paginate_queryset(timeline)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="for-you",
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination,
+    )
+    def show_posts_for_you(self, request):
+        """Endpoint for showing the posts ranked for the user"""
+        own_profile = self.request.user.profile
+        post_ids = self.paginate_queryset(get_ranked_post_ids(own_profile))
+        posts = self.get_queryset().in_bulk(post_ids)
+        serializer = self.get_serializer(
+            [posts[post_id] for post_id in post_ids if post_id in posts],
+            many=True,
+        )
+        return self.get_paginated_response(serializer.data)
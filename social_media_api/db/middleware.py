@@ -0,0 +1,96 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from social_media_api.db.routers import read_from_replica
+
+
+def _get_token_user_id(request):
+    """Read the user from the access token alone, before any query"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+
+    if header is None:
+        return None
+
+    try:
+        raw_token = authentication.get_raw_token(header)
+
+        if raw_token is None:
+            return None
+
+        token = authentication.get_validated_token(raw_token)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def _get_pin_key(user_id):
+    return f"primary-pin:{user_id}"
+
+
+def _get_pin_timeout():
+    return settings.DATABASE_PRIMARY_PIN_TIMEOUT
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Read from a replica during the safe requests, except for the users
+    who have written in the last DATABASE_PRIMARY_PIN_TIMEOUT seconds,
+    so they see their own likes and comments despite the replication lag
+    """
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not settings.DATABASE_REPLICAS:
+                return await get_response(request)
+
+            user_id = _get_token_user_id(request)
+            key = _get_pin_key(user_id)
+
+            if request.method not in SAFE_METHODS:
+                response = await get_response(request)
+
+                if user_id is not None:
+                    await cache.aset(key, True, timeout=_get_pin_timeout())
+
+                return response
+
+            if user_id is not None and await cache.aget(key):
+                return await get_response(request)
+
+            with read_from_replica():
+                return await get_response(request)
+    else:
+        def middleware(request):
+            if not settings.DATABASE_REPLICAS:
+                return get_response(request)
+
+            user_id = _get_token_user_id(request)
+            key = _get_pin_key(user_id)
+
+            if request.method not in SAFE_METHODS:
+                response = get_response(request)
+
+                if user_id is not None:
+                    cache.set(key, True, timeout=_get_pin_timeout())
+
+                return response
+
+            if user_id is not None and cache.get(key):
+                return get_response(request)
+
+            with read_from_replica():
+                return get_response(request)
+
+    return middleware
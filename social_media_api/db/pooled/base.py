@@ -0,0 +1,140 @@
+"""
+PostgreSQL backend borrowing its connections from a pool kept per process.
+
+Enable it with OPTIONS["pool"] = {"min_size": ..., "max_size": ...,
+"timeout": ...} and CONN_MAX_AGE = 0: Django "closes" the connection at the
+end of every request, which returns it to the pool instead.
+"""
+import threading
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+from psycopg2 import pool
+
+POOL_DEFAULTS = {"min_size": 1, "max_size": 10, "timeout": 10}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """Wait for a free connection instead of failing when all are in use"""
+
+    def __init__(self, min_size, max_size, timeout, **conn_params):
+        self._semaphore = threading.BoundedSemaphore(max_size)
+        self._timeout = timeout
+        super().__init__(min_size, max_size, **conn_params)
+        # psycopg2 closes the returned connections beyond minconn, so keep
+        # them all: min_size only tells how many are opened up front
+        self.minconn = max_size
+
+    def getconn(self, key=None):
+        if not self._semaphore.acquire(timeout=self._timeout):
+            raise pool.PoolError(
+                f"No free connection in the pool after {self._timeout}s"
+            )
+
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            # Unfinished transactions are rolled back, broken
+            # connections are closed
+            super().putconn(conn, key, close)
+        finally:
+            self._semaphore.release()
+
+
+def close_pools():
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+
+        _pools.clear()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def destroy_test_db(self, *args, **kwargs):
+        # The idle pooled connections would keep the test database in use
+        close_pools()
+        return super().destroy_test_db(*args, **kwargs)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        # The test databases change the parameters of the same alias
+        key = (self.alias, repr(sorted(conn_params.items())))
+
+        with _pools_lock:
+            if key not in _pools:
+                options = {
+                    **POOL_DEFAULTS,
+                    **self.settings_dict["OPTIONS"].get("pool", {}),
+                }
+                _pools[key] = BlockingConnectionPool(
+                    options["min_size"],
+                    options["max_size"],
+                    options["timeout"],
+                    **conn_params,
+                )
+
+            return _pools[key]
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        connection = connection_pool.getconn()
+
+        while not self._is_healthy(connection):
+            connection_pool.putconn(connection, close=True)
+            connection = connection_pool.getconn()
+
+        self._pool = connection_pool
+        self.isolation_level = IsolationLevel.READ_COMMITTED
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+
+        if isolation_level is not None:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection,
+            loads=lambda x: x,
+        )
+        return connection
+
+    def _is_healthy(self, connection):
+        if connection.closed:
+            return False
+
+        if not self.settings_dict["CONN_HEALTH_CHECKS"]:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.putconn(self.connection)
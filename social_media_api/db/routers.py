@@ -0,0 +1,61 @@
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Replica the reads of the current request go to, None for the primary
+_replica = contextvars.ContextVar("replica", default=None)
+
+
+@contextmanager
+def read_from_replica():
+    """Send the reads of the block to one of the replicas, if any"""
+    replica = (
+        random.choice(settings.DATABASE_REPLICAS)
+        if settings.DATABASE_REPLICAS else None
+    )
+    token = _replica.set(replica)
+
+    try:
+        yield replica
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Send the reads of the block to the primary, within a safe request"""
+    token = _replica.set(None)
+
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route the reads to the replica chosen for the current request, and
+    everything else to the primary, which the replicas copy
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+
+        # A transaction reads its own writes
+        if replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # Not the database of the instance, which may come from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/4.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
+import copy
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -26,7 +27,9 @@ SECRET_KEY = os.environ["SECRET_KEY"]
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ["DEBUG"] or False
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host
+]
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -41,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
@@ -52,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "social_media_api.db.middleware.replica_routing_middleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,9 +97,68 @@ DATABASES = {
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+        # Keep the connections open between the requests of a thread,
+        # checking them before reuse. Leave it at 0 under ASGI, where
+        # every request runs in a new thread, and use the pool instead
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# In-process pool of every worker, to size at least to its threads; the
+# connections go back to it at the end of every request
+if os.environ.get("POSTGRES_POOL_MAX_SIZE"):
+    DATABASES["default"].update(
+        ENGINE="social_media_api.db.pooled",
+        CONN_MAX_AGE=0,
+        OPTIONS={
+            "pool": {
+                "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 1)),
+                "max_size": int(os.environ["POSTGRES_POOL_MAX_SIZE"]),
+                "timeout": int(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+            },
+        },
+    )
+
+# Read replicas of the primary database, their "host[:port]" separated
+# by commas; the safe requests read from one of them
+for index, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")),
+    start=1,
+):
+    host, _, port = address.partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host,
+        "PORT": port,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["social_media_api.db.routers.ReplicaRouter"]
+
+# Seconds the users read from the primary after writing
+DATABASE_PRIMARY_PIN_TIMEOUT = int(
+    os.environ.get("DATABASE_PRIMARY_PIN_TIMEOUT", 10)
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -136,10 +200,31 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = "/vol/web/static"
 
 MEDIA_ROOT = "/vol/web/media"
 MEDIA_URL = "/media/"
 
+# The media files are sent by the front web server when it handles this
+# header: "X-Accel-Redirect" (nginx) maps the files to the internal
+# MEDIA_SENDFILE_ROOT location, "X-Sendfile" takes their path. The
+# development server runs without one, so it always streams the files
+MEDIA_SENDFILE_HEADER = (
+    "" if DEBUG else os.environ.get("MEDIA_SENDFILE_HEADER", "")
+)
+MEDIA_SENDFILE_ROOT = "/protected-media/"
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Media files are stored once per content and reference-counted
+STORAGES = {
+    "default": {
+        "BACKEND": "social_media.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -159,7 +244,7 @@ REST_FRAMEWORK = {
         "user": "1000/day",
     },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
 }
 
@@ -179,4 +264,69 @@ SPECTACULAR_SETTINGS = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=10),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "user.serializers.TokenBlacklistSerializer",
+}
+
+# Seconds a refresh token found out of the blacklist table is trusted for
+# before the table is checked again; the blacklisted tokens are rejected
+# from the cache immediately
+JWT_BLACKLIST_CHECK_TIMEOUT = 60 * 60
+
+# Home timelines of the subscriptions-only feed: posts are fanned out
+# on commit to the followers of their author, except for authors with
+# too many followers whose posts are merged into the feed on read. The
+# trim_timelines command cuts the timelines back to their maximum length.
+TIMELINE_MAX_LENGTH = 800
+TIMELINE_FANOUT_FOLLOWERS_LIMIT = 10000
+
+# Trending hashtags: the usage of a hashtag decays exponentially with the
+# half-life of each window, given in seconds.
+TRENDING_WINDOWS = {
+    "1h": 60 * 60,
+    "24h": 24 * 60 * 60,
+    "7d": 7 * 24 * 60 * 60,
+}
+TRENDING_DEFAULT_WINDOW = "24h"
+TRENDING_TOP_K = 50
+TRENDING_CACHE_TIMEOUT = 60
+
+# Ranked "for you" feed
+FEED_CANDIDATES_LIMIT = 500
+FEED_MAX_AGE = 7 * 24 * 60 * 60
+FEED_RECENCY_HALF_LIFE = 6 * 60 * 60
+FEED_TRENDING_WINDOW = "24h"
+FEED_WEIGHTS = {
+    "recency": 1.0,
+    "engagement": 0.5,
+    "proximity": 1.0,
+}
+FEED_CACHE_TIMEOUT = 60
+
+# "Who to follow" suggestions, kept per profile by the
+# compute_follow_suggestions command
+FOLLOW_SUGGESTIONS_SIZE = 20
+FOLLOW_SUGGESTIONS_HASHTAG_WEIGHT = 0.5
+
+# Processed variants of the uploaded images, the longest side of each size
+# in pixels; every size is also stored as WebP
+IMAGE_VARIANT_SIZES = {
+    "small": 320,
+    "medium": 800,
+    "large": 1600,
 }
+IMAGE_JPEG_QUALITY = 85
+IMAGE_WEBP_QUALITY = 80
+IMAGE_TASK_MAX_ATTEMPTS = 3
+IMAGE_WORKER_POLL_INTERVAL = 2
+
+# The image uploads are streamed to disk by their views and bounded in
+# bytes and in decoded pixels
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+IMAGE_UPLOAD_TOKEN_MAX_AGE = 15 * 60
+
+# Orphaned media files are kept this long, in seconds, before
+# collect_media_garbage purges them
+MEDIA_GC_GRACE_PERIOD = 24 * 60 * 60
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -8,6 +7,8 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from social_media.media import serve_media
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path(
@@ -27,4 +28,9 @@ urlpatterns = [
         name="redoc",
     ),
     path("__debug__/", include("debug_toolbar.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f"{settings.MEDIA_URL.lstrip('/')}<path:path>",
+        serve_media,
+        name="media",
+    ),
+]
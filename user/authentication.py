@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from user.denylist import is_token_revoked, ais_token_revoked
+
+PROFILE_ID_CLAIM = "profile_id"
+IS_STAFF_CLAIM = "is_staff"
+
+
+def add_user_claims(token, user):
+    """Add the claims the stateless authentication answers from"""
+    try:
+        profile_id = user.profile.id
+    except ObjectDoesNotExist:
+        profile_id = None
+
+    token[PROFILE_ID_CLAIM] = profile_id
+    token[IS_STAFF_CLAIM] = user.is_staff
+    return token
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    User of a validated token answering its id, staff status and profile
+    from the claims, and loaded from the database on any other access
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    # The tokens of the deactivated users are revoked
+    is_active = True
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(
+            lambda: get_user_model().objects.get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        )
+        self.__dict__["_token"] = token
+        self.__dict__["_profile"] = empty
+
+    def _load(self):
+        if self._wrapped is empty:
+            self._setup()
+
+        return self._wrapped
+
+    @property
+    def id(self):
+        return self._token[api_settings.USER_ID_CLAIM]
+
+    pk = id
+
+    @property
+    def is_staff(self):
+        if IS_STAFF_CLAIM in self._token:
+            return self._token[IS_STAFF_CLAIM]
+
+        return self._load().is_staff
+
+    @property
+    def profile_id(self):
+        if self._token.get(PROFILE_ID_CLAIM) is not None:
+            return self._token[PROFILE_ID_CLAIM]
+
+        return self.profile.id
+
+    @property
+    def profile(self):
+        """
+        Profile of the claim with its other fields deferred, so loaded
+        only when read, or the profile of the loaded user for the tokens
+        issued before it was created
+        """
+        if self._profile is empty:
+            profile_id = self._token.get(PROFILE_ID_CLAIM)
+
+            if profile_id is None:
+                profile = self._load().profile
+            else:
+                profile_model = (
+                    get_user_model()._meta.get_field("profile").related_model
+                )
+                loaded = {"id": profile_id, "user_id": self.id}
+                profile = profile_model.from_db(
+                    None,
+                    list(loaded),
+                    [
+                        loaded[field.attname]
+                        for field in profile_model._meta.concrete_fields
+                        if field.attname in loaded
+                    ],
+                )
+
+            self.__dict__["_profile"] = profile
+
+        return self._profile
+
+    def __bool__(self):
+        return True
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication trusting the signed claims instead of loading
+    the user on every request; the revoked tokens are checked in the
+    cached denylist
+    """
+
+    def get_user(self, validated_token):
+        self._check_claims(validated_token)
+
+        if is_token_revoked(validated_token):
+            self._raise_revoked()
+
+        return LazyUser(validated_token)
+
+    @staticmethod
+    def _check_claims(validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+    @staticmethod
+    def _raise_revoked():
+        raise AuthenticationFailed(
+            _("Token has been revoked"),
+            code="token_revoked",
+        )
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """Stateless JWT authentication checking the denylist asynchronously"""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        self._check_claims(validated_token)
+
+        if await ais_token_revoked(validated_token):
+            self._raise_revoked()
+
+        return LazyUser(validated_token)
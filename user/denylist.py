@@ -0,0 +1,101 @@
+"""
+Revoked tokens, kept in the cache until they expire so that the stateless
+authentication checks them without a query. The refresh tokens found out
+of the blacklist table are remembered for a while too, so that most
+refreshes skip the table. The cache must be shared by all the workers,
+like the Redis one of the production settings.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _get_token_key(jti):
+    return f"jwt-denylist:token:{jti}"
+
+
+def _get_user_key(user_id):
+    return f"jwt-denylist:user:{user_id}"
+
+
+def _get_checked_key(jti):
+    return f"jwt-denylist:checked:{jti}"
+
+
+def _get_keys(token):
+    return (
+        _get_token_key(token[api_settings.JTI_CLAIM]),
+        _get_user_key(token[api_settings.USER_ID_CLAIM]),
+    )
+
+
+def _is_revoked(token, denied):
+    token_key, user_key = _get_keys(token)
+    revoked_at = denied.get(user_key)
+    return token_key in denied or (
+        revoked_at is not None and token["iat"] <= revoked_at
+    )
+
+
+def revoke_jti(jti, exp):
+    """Reject the token of this id until its expiration timestamp"""
+    cache.set(
+        _get_token_key(jti),
+        True,
+        timeout=max(exp - int(time.time()), 1),
+    )
+
+
+def revoke_token(token):
+    """Reject the token until it expires"""
+    revoke_jti(token[api_settings.JTI_CLAIM], token["exp"])
+
+
+def revoke_user_tokens(user_id):
+    """Reject all the tokens issued to the user until now"""
+    cache.set(
+        _get_user_key(user_id),
+        int(time.time()),
+        timeout=int(
+            settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds()
+        ),
+    )
+
+
+def is_token_revoked(token):
+    return _is_revoked(token, cache.get_many(_get_keys(token)))
+
+
+async def ais_token_revoked(token):
+    return _is_revoked(token, await cache.aget_many(_get_keys(token)))
+
+
+def get_blacklist_state(token):
+    """
+    Return True if the token is revoked, False if it was recently found
+    out of the blacklist table, or None if the table must be checked
+    """
+    checked_key = _get_checked_key(token[api_settings.JTI_CLAIM])
+    denied = cache.get_many((*_get_keys(token), checked_key))
+
+    if _is_revoked(token, denied):
+        return True
+
+    return False if checked_key in denied else None
+
+
+def mark_token_checked(token):
+    """
+    Remember the token was found out of the blacklist table; revoking it
+    takes precedence over this mark
+    """
+    cache.set(
+        _get_checked_key(token[api_settings.JTI_CLAIM]),
+        True,
+        timeout=min(
+            max(token["exp"] - int(time.time()), 1),
+            settings.JWT_BLACKLIST_CHECK_TIMEOUT,
+        ),
+    )
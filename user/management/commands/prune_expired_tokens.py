@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Delete the expired outstanding tokens and their blacklist entries in
+    short transactions, unlike flushexpiredtokens which deletes them all
+    at once; meant to run periodically
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Tokens deleted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        pruned = 0
+
+        self.stdout.write("Pruning the expired tokens...")
+
+        while True:
+            with transaction.atomic():
+                token_ids = list(
+                    OutstandingToken.objects
+                    .filter(expires_at__lte=now)
+                    .order_by("expires_at")
+                    .values_list("id", flat=True)[:options["batch_size"]]
+                )
+
+                if not token_ids:
+                    break
+
+                BlacklistedToken.objects.filter(
+                    token_id__in=token_ids
+                ).delete()
+                OutstandingToken.objects.filter(id__in=token_ids).delete()
+                pruned += len(token_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{pruned} expired token(s) pruned!")
+        )
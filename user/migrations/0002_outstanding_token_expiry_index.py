@@ -0,0 +1,29 @@
+# Generated by Django 4.2.6 on 2026-10-18 09:12
+
+from django.db import migrations
+
+# The pruning of the expired outstanding tokens scans them by expiry
+OUTSTANDING_TOKEN_EXPIRY_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS token_blacklist_outstanding_expires_idx
+ON token_blacklist_outstandingtoken (expires_at);
+"""
+
+OUTSTANDING_TOKEN_EXPIRY_INDEX_REVERSE_SQL = """
+DROP INDEX CONCURRENTLY IF EXISTS token_blacklist_outstanding_expires_idx;
+"""
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("user", "0001_initial"),
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            OUTSTANDING_TOKEN_EXPIRY_INDEX_SQL,
+            OUTSTANDING_TOKEN_EXPIRY_INDEX_REVERSE_SQL,
+        ),
+    ]
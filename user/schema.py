@@ -0,0 +1,8 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    """Document the stateless authentication as the simplejwt bearer one"""
+
+    target_class = "user.authentication.StatelessJWTAuthentication"
+    match_subclasses = True
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from user.denylist import revoke_jti, revoke_user_tokens
+from user.models import User
+
+# The claims and the validity of the issued tokens depend on them
+TOKEN_FIELDS = ("password", "is_active", "is_staff")
+
+
+@receiver(pre_save, sender=User)
+def revoke_outdated_tokens(sender, instance, update_fields, **kwargs):
+    if instance.pk is None:
+        return
+
+    if update_fields is not None and not set(TOKEN_FIELDS) & set(
+        update_fields
+    ):
+        return
+
+    old_values = (
+        User.objects
+        .filter(pk=instance.pk)
+        .values_list(*TOKEN_FIELDS)
+        .first()
+    )
+    new_values = tuple(getattr(instance, field) for field in TOKEN_FIELDS)
+
+    if old_values is not None and old_values != new_values:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def revoke_blacklisted_token(sender, instance, created, **kwargs):
+    # Also covers the tokens blacklisted from the admin
+    if created:
+        revoke_jti(
+            instance.token.jti,
+            datetime_to_epoch(instance.token.expires_at),
+        )
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+class PruneExpiredTokensCommandTests(TestCase):
+    def test_prune_expired_tokens_in_batches(self):
+        now = timezone.now()
+
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                jti=f"expired-{i}",
+                token="token",
+                expires_at=now - timedelta(days=1),
+            )
+            BlacklistedToken.objects.create(token=token)
+
+        OutstandingToken.objects.create(
+            jti="valid",
+            token="token",
+            expires_at=now + timedelta(days=1),
+        )
+
+        call_command(
+            "prune_expired_tokens",
+            batch_size=2,
+            stdout=StringIO(),
+        )
+
+        self.assertEquals(
+            list(OutstandingToken.objects.values_list("jti", flat=True)),
+            ["valid"],
+        )
+        self.assertFalse(BlacklistedToken.objects.exists())
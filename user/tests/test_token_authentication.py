@@ -0,0 +1,214 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.models import Profile
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+TOKEN_BLACKLIST_URL = reverse("user:token_blacklist")
+LOGOUT_URL = reverse("user:logout")
+ME_URL = reverse("user:manage")
+ASYNC_SUBSCRIPTIONS_ONLY_URL = reverse(
+    "social_media:async-post-subscriptions-only"
+)
+
+
+class StatelessTokenAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.profile = Profile.objects.create(
+            user=self.user,
+            username="test_user",
+        )
+        self.client = APIClient()
+
+    def obtain_tokens(self):
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": self.user.email, "password": "test_pass"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_tokens_carry_profile_and_staff_claims(self):
+        tokens = self.obtain_tokens()
+        access = AccessToken(tokens["access"])
+
+        self.assertEqual(access["profile_id"], self.profile.id)
+        self.assertFalse(access["is_staff"])
+
+        res = self.client.post(
+            TOKEN_REFRESH_URL,
+            {"refresh": tokens["refresh"]},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            AccessToken(res.data["access"])["profile_id"],
+            self.profile.id,
+        )
+
+    def test_authentication_does_not_load_user_or_profile(self):
+        self.authenticate(self.obtain_tokens()["access"])
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ASYNC_SUBSCRIPTIONS_ONLY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user_table = get_user_model()._meta.db_table
+        profile_table = Profile._meta.db_table
+
+        for query in queries:
+            self.assertNotIn(f'FROM "{user_table}"', query["sql"])
+            self.assertNotIn(f'"{profile_table}"."user_id" =', query["sql"])
+
+    def test_user_loaded_on_access(self):
+        self.authenticate(self.obtain_tokens()["access"])
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_token_without_profile_claim_loads_profile(self):
+        self.authenticate(AccessToken.for_user(self.user))
+
+        res = self.client.get(ASYNC_SUBSCRIPTIONS_ONLY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_logout_revokes_tokens(self):
+        tokens = self.obtain_tokens()
+        self.authenticate(tokens["access"])
+
+        res = self.client.post(
+            LOGOUT_URL,
+            {"refresh_token": tokens["refresh"]},
+        )
+        self.assertEqual(res.status_code, status.HTTP_205_RESET_CONTENT)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.get(ASYNC_SUBSCRIPTIONS_ONLY_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_tokens(self):
+        tokens = self.obtain_tokens()
+        self.user.set_password("new_test_pass")
+        self.user.save()
+
+        self.authenticate(tokens["access"])
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(
+            TOKEN_REFRESH_URL,
+            {"refresh": tokens["refresh"]},
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes_tokens(self):
+        self.authenticate(self.obtain_tokens()["access"])
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrelated_update_keeps_tokens(self):
+        self.authenticate(self.obtain_tokens()["access"])
+        self.user.email = "new@test.com"
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class CachedBlacklistTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_pass",
+        )
+        self.client = APIClient()
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": self.user.email, "password": "test_pass"},
+        )
+        self.refresh = res.data["refresh"]
+
+    def refresh_token(self):
+        return self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+
+    def test_checked_refresh_token_skips_blacklist_table(self):
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_200_OK)
+
+        blacklist_table = BlacklistedToken._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.refresh_token()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        for query in queries:
+            self.assertNotIn(blacklist_table, query["sql"])
+
+    def test_blacklisted_refresh_token_rejected(self):
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_200_OK)
+
+        res = self.client.post(TOKEN_BLACKLIST_URL, {"refresh": self.refresh})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.refresh_token().status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_token_blacklisted_in_table_rejected(self):
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_200_OK)
+
+        BlacklistedToken.objects.create(
+            token=OutstandingToken.objects.get(user=self.user)
+        )
+
+        self.assertEqual(
+            self.refresh_token().status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+
+class TokenAuthenticationSchemaTests(SimpleTestCase):
+    def test_schema_documents_bearer_scheme(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEquals(
+            schema["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer",
+        )
+        self.assertIn(
+            {"jwtAuth": []},
+            schema["paths"][ME_URL]["get"]["security"],
+        )
@@ -0,0 +1,21 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+
+from user.denylist import get_blacklist_state, mark_token_checked
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token checking the cached denylist before the blacklist table,
+    which is queried only for the tokens not seen for a while
+    """
+
+    def check_blacklist(self):
+        state = get_blacklist_state(self)
+
+        if state is None:
+            super().check_blacklist()
+            mark_token_checked(self)
+        elif state:
+            raise TokenError(_("Token is blacklisted"))
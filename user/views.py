@@ -2,9 +2,9 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-
+from user.denylist import revoke_token
 from user.serializers import UserSerializer
+from user.tokens import RefreshToken
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -27,6 +27,8 @@ class LogoutView(APIView):
             refresh_token = request.data["refresh_token"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            # The access token stays valid until it expires otherwise
+            revoke_token(request.auth)
 
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception: